@@ -0,0 +1,234 @@
+"""Apply a pipeline of operations to many PitchClassSets at once, across
+processes.
+
+    from batch import apply
+    names = apply(pc_sets, [("transposed", 3), "complement", "set_class"])
+
+A pipeline is a list of steps, each the name of an operation or a tuple of
+its name and arguments, as for the PitchClassSet methods of the same names:
+transposed, inverted, m_transformed, as_univ, complement and prime_form,
+which give sets, and vector and set_class, which give values and can only
+come last. Sets travel to and from the worker processes as bitmasks packed
+into shared memory, a chunk of sets per task, and the results are returned
+in the order of the input.
+
+Rescaling between universes is counted by the instrumentation of
+pitchclasses when steps run in this process; steps run in a pool are counted
+(if at all) in the worker processes, not here."""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pitchclasses
+from pitchclasses import (
+    IntervalVector,
+    PitchClassSet,
+    PitchClassSetArray,
+    _check_equivalence,
+    _interval_counts,
+    _mapped_mask,
+    _mask_map_tables,
+    _pc_typecode,
+    _prime_mask,
+    _reflected,
+    _rotated,
+    _univ_images,
+)
+
+CHUNK_SIZE = 1 << 14
+SET_STEPS = ("transposed", "inverted", "m_transformed", "as_univ", "complement")
+SET_STEPS += ("prime_form",)
+VALUE_STEPS = ("vector", "set_class")
+# the least and most arguments each step takes
+STEP_ARGUMENTS = {
+    "transposed": (1, 1),
+    "inverted": (1, 1),
+    "m_transformed": (1, 1),
+    "as_univ": (1, 2),
+    "complement": (0, 0),
+    "prime_form": (0, 1),
+    "vector": (0, 0),
+    "set_class": (0, 1),
+}
+
+
+def apply(pc_sets, pipeline, processes=None, chunk_size=CHUNK_SIZE):
+    """return the result of applying each step of pipeline in turn to each of
+    pc_sets (a PitchClassSetArray, or PitchClassSets in the same universe): a
+    PitchClassSetArray, or a list of IntervalVectors or set class names if the
+    pipeline ends with vector or set_class. Runs in this process if processes
+    is 1, and otherwise in a pool of that many processes (by default, one per
+    CPU)."""
+    if not isinstance(pc_sets, PitchClassSetArray):
+        pc_sets = PitchClassSetArray.from_sets(list(pc_sets))
+    steps, univ, kind = _checked_pipeline(pipeline, pc_sets.univ)
+    masks = pc_sets.masks
+    if processes == 1 or len(masks) <= chunk_size:
+        results = [_apply_steps(mask, steps, pc_sets.univ) for mask in masks]
+    else:
+        results = _apply_in_processes(
+            masks, steps, pc_sets.univ, univ, kind, processes, chunk_size
+        )
+    if kind == "vector":
+        return [IntervalVector(counts, univ=univ) for counts in results]
+    if kind == "set_class":
+        equivalence = steps[-1][1][0]
+        names = {}
+        for prime in set(results):
+            pc_set = PitchClassSet._from_mask(prime, univ)
+            names[prime] = pc_set.set_class(equivalence)
+        return [names[prime] for prime in results]
+    return PitchClassSetArray._from_masks(results, univ)
+
+
+def _checked_pipeline(pipeline, univ):
+    """return the steps of pipeline as (name, arguments) pairs with their
+    arguments completed, the universe they end in, and the kind of result"""
+    steps = []
+    kind = "set"
+    for step in pipeline:
+        if isinstance(step, str):
+            name, arguments = step, ()
+        else:
+            name, arguments = step[0], tuple(step[1:])
+        if kind != "set":
+            raise ValueError("{} must be the last step of a pipeline".format(kind))
+        if name not in SET_STEPS + VALUE_STEPS:
+            raise ValueError("Unknown step {}".format(name))
+        least, most = STEP_ARGUMENTS[name]
+        if not least <= len(arguments) <= most:
+            expected = str(least) if least == most else "{} to {}".format(least, most)
+            raise ValueError(
+                "{} takes {} argument{}, not {}".format(
+                    name, expected, "" if expected == "1" else "s", len(arguments)
+                )
+            )
+        if name == "as_univ":
+            new_univ, mode = (arguments + ("e",))[:2]
+            _univ_images(univ, new_univ, mode)  # raises for an unknown mode
+            arguments = (univ, new_univ, mode)
+            univ = new_univ
+        elif name in ("prime_form", "set_class"):
+            arguments = arguments or ("TnI",)
+            _check_equivalence(arguments[0])
+        elif name == "m_transformed":
+            images = tuple((pc * arguments[0]) % univ for pc in range(univ))
+            arguments = (_mask_map_tables(images),)
+        if name in VALUE_STEPS:
+            kind = name
+        steps.append((name, arguments))
+    return tuple(steps), univ, kind
+
+
+def _apply_steps(mask, steps, univ):
+    "return the result of applying steps to mask, a set in univ"
+    for name, arguments in steps:
+        if name == "transposed":
+            mask = _rotated(mask, arguments[0], univ)
+        elif name == "inverted":
+            mask = _rotated(_reflected(mask, univ), arguments[0], univ)
+        elif name == "m_transformed":
+            mask = _mapped_mask(mask, arguments[0])
+        elif name == "as_univ":
+            # looked up on the module, where instrumentation wraps it
+            mask = pitchclasses._rescaled_mask(mask, *arguments)
+            univ = arguments[1]
+        elif name == "complement":
+            mask = ((1 << univ) - 1) & ~mask
+        elif name == "prime_form" or name == "set_class":
+            mask = _prime_mask(mask, univ, arguments[0])
+        elif name == "vector":
+            return _interval_counts(mask, univ)
+    return mask
+
+
+def _apply_in_processes(masks, steps, univ, new_univ, kind, processes, chunk_size):
+    """return the results of _apply_steps for masks, computed a chunk at a time
+    in a pool of processes, which read the masks from and write their results
+    to blocks of shared memory"""
+    in_width = _mask_width(univ)
+    if kind == "vector":
+        out_width = _vector_width(new_univ)
+    else:
+        out_width = _mask_width(new_univ)
+    # a block of size 0 cannot be created, so give each at least one byte
+    source = shared_memory.SharedMemory(create=True, size=max(1, len(masks) * in_width))
+    target = shared_memory.SharedMemory(
+        create=True, size=max(1, len(masks) * out_width)
+    )
+    try:
+        source.buf[: len(masks) * in_width] = b"".join(
+            mask.to_bytes(in_width, "little") for mask in masks
+        )
+        chunks = [
+            (start, min(start + chunk_size, len(masks)))
+            for start in range(0, len(masks), chunk_size)
+        ]
+        with ProcessPoolExecutor(processes) as executor:
+            tasks = [
+                executor.submit(
+                    _apply_to_chunk,
+                    source.name,
+                    target.name,
+                    start,
+                    stop,
+                    steps,
+                    univ,
+                    new_univ,
+                    kind,
+                )
+                for start, stop in chunks
+            ]
+            for task in tasks:
+                task.result()  # raises any exception from the chunk
+        data = bytes(target.buf[: len(masks) * out_width])
+    finally:
+        for block in (source, target):
+            block.close()
+            block.unlink()
+    if kind == "vector":
+        counts = array(_pc_typecode(new_univ + 1))
+        counts.frombytes(data)
+        size = new_univ // 2
+        if not size:  # the vectors of univ 1 are empty
+            return [[] for mask in masks]
+        return [counts[i : i + size].tolist() for i in range(0, len(counts), size)]
+    return [
+        int.from_bytes(data[i : i + out_width], "little")
+        for i in range(0, len(data), out_width)
+    ]
+
+
+def _apply_to_chunk(source_name, target_name, start, stop, steps, univ, new_univ, kind):
+    "apply steps to the masks from start to stop in shared memory"
+    source = shared_memory.SharedMemory(name=source_name)
+    target = shared_memory.SharedMemory(name=target_name)
+    try:
+        in_width = _mask_width(univ)
+        data = bytes(source.buf[start * in_width : stop * in_width])
+        results = [
+            _apply_steps(int.from_bytes(data[i : i + in_width], "little"), steps, univ)
+            for i in range(0, len(data), in_width)
+        ]
+        if kind == "vector":
+            out_width = _vector_width(new_univ)
+            counts = [count for result in results for count in result]
+            packed = array(_pc_typecode(new_univ + 1), counts).tobytes()
+        else:
+            out_width = _mask_width(new_univ)
+            packed = b"".join(mask.to_bytes(out_width, "little") for mask in results)
+        target.buf[start * out_width : stop * out_width] = packed
+    finally:
+        source.close()
+        target.close()
+
+
+def _mask_width(univ):
+    "return the bytes in a packed bitmask of univ"
+    return (univ + 7) // 8
+
+
+def _vector_width(univ):
+    "return the bytes in a packed interval vector of univ"
+    return (univ // 2) * array(_pc_typecode(univ + 1)).itemsize
@@ -0,0 +1,157 @@
+"""Benchmarks for the hot paths of pitchclasses, swept over universe size and
+cardinality.
+
+    python benchmarks.py                          # print timings
+    python benchmarks.py --save baseline.json     # record a baseline
+    python benchmarks.py --compare baseline.json  # fail on regressions
+
+Inputs are generated from a fixed seed, so runs time the same work. Each
+timing is the best of several repeats, in seconds per call."""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+
+from pitchclasses import (
+    IntervalSequence,
+    PitchClassSequence,
+    PitchClassSet,
+    SetSequence,
+)
+
+UNIVERSES = (12, 24, 53, 72, 1200)
+SEQUENCE_LENGTH = 1000
+AS_UNIV_MODES = ("d", "c", "r", "f")
+
+
+def cardinalities(univ):
+    return sorted({3, univ // 4, univ // 2})
+
+
+def set_benchmarks(univ, card, rng):
+    pcs = rng.sample(range(univ), card)
+    a = PitchClassSet(pcs, univ)
+    b = PitchClassSet(rng.sample(range(univ), card), univ)
+    doubled = b.as_univ(2 * univ)
+    coprime = PitchClassSet(rng.sample(range(univ + 1), card), univ + 1)
+    cases = [
+        ("set.init", lambda: PitchClassSet(pcs, univ)),
+        ("set.and", lambda: a & b),
+        ("set.or", lambda: a | b),
+        ("set.xor", lambda: a ^ b),
+        ("set.sub", lambda: a - b),
+        ("set.le", lambda: a <= b),
+        ("set.eq_doubled_univ", lambda: a == doubled),
+        ("set.le_coprime_univ", lambda: a <= coprime),
+        ("set.vector", a.vector),
+        ("set.complement", a.complement),
+        ("set.as_univ.e", lambda: a.as_univ(2 * univ)),
+    ]
+    for mode in AS_UNIV_MODES:
+        cases.append(
+            ("set.as_univ." + mode, lambda mode=mode: a.as_univ(univ + 1, mode))
+        )
+    return cases
+
+
+def sequence_benchmarks(univ, length, rng):
+    pcs = [rng.randrange(univ) for i in range(length)]
+    sequence = PitchClassSequence(pcs, univ)
+    intervals = sequence.intervals().intervals
+    chords = [rng.sample(range(univ), 3) for i in range(length)]
+    return [
+        ("sequence.init", lambda: PitchClassSequence(pcs, univ)),
+        ("sequence.intervals", sequence.intervals),
+        ("sequence.as_univ.e", lambda: sequence.as_univ(2 * univ)),
+        ("intervals.melody", lambda: IntervalSequence(intervals, univ).melody(0)),
+        ("set_sequence.init", lambda: SetSequence(chords, univ)),
+    ]
+
+
+def benchmarks():
+    """return (name, function) pairs for every benchmark; the functions take
+    no arguments, and their inputs are built beforehand"""
+    rng = random.Random(0)
+    cases = []
+    for univ in UNIVERSES:
+        for card in cardinalities(univ):
+            for name, function in set_benchmarks(univ, card, rng):
+                label = "{}[univ={},card={}]".format(name, univ, card)
+                cases.append((label, function))
+        for name, function in sequence_benchmarks(univ, SEQUENCE_LENGTH, rng):
+            label = "{}[univ={},len={}]".format(name, univ, SEQUENCE_LENGTH)
+            cases.append((label, function))
+    return cases
+
+
+def run(pattern="", repeat=5):
+    "return the best time per call of each benchmark whose name has pattern"
+    results = {}
+    for name, function in benchmarks():
+        if pattern not in name:
+            continue
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()  # calls taking at least 0.2 seconds
+        number = max(1, number // 4)
+        results[name] = min(timer.repeat(repeat, number)) / number
+        print("{:<50} {:>12.3f} us".format(name, results[name] * 1e6))
+    return results
+
+
+def compare(baseline, results, threshold):
+    """return the names of the benchmarks more than threshold (a fraction)
+    slower than in baseline, printing the ratio for each benchmark in both"""
+    regressions = []
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        ratio = seconds / baseline[name]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print("{:<50} {:>8.2f}x{}".format(name, ratio, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--filter", default="", help="run benchmarks whose name has this"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results with this JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="fraction by which a benchmark may be slower than the baseline",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.repeat)
+    if args.save:
+        with open(args.save, "w") as file:
+            record = {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            }
+            json.dump(record, file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        print()
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print("\n{} benchmarks regressed".format(len(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
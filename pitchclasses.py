@@ -1,9 +1,29 @@
-from math import ceil, floor, gcd, lcm
+import heapq
+import mmap
+import os
+import pickle
+import re
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial, reduce, wraps
+from itertools import accumulate, islice
+from math import comb, gcd, lcm, sqrt
+from operator import add, mul, sub
+from time import perf_counter
 
 PC_UNIVERSE = 12  # default is 12 tone equal temperament
+TABLE_UNIV_LIMIT = 16  # largest universe whose prime forms are fully tabulated
 
 
 class PitchClasses:
+    __slots__ = ("univ",)
+
     def __init__(self, pcs, univ=0):
         if univ == 0:
             self.univ = PC_UNIVERSE
@@ -32,30 +52,20 @@ class PitchClasses:
 
     def _as_univ(self, new_univ, mode="e"):
         "return list of pitch classes, scaled by new_univ"
-        multiplier = new_univ / self.univ
-        new_pcs = [x * multiplier for x in self.pcs]
+        images = _univ_images(self.univ, new_univ, mode)
 
         # different options for what to do with pitch classes that do not fit cleanly when pitch class universe is resized
         if mode == "e" or mode == "exception":
-            for pc in new_pcs:
-                if int(pc) != pc:
-                    err = round(pc / multiplier)
+            for pc in self.pcs:
+                if images[pc] is None:
                     raise ValueError(
                         "pitch class {} does not exist in a universe of size {}.".format(
-                            err, new_univ
+                            pc, new_univ
                         )
                     )
-            return [int(x) for x in new_pcs]
         elif mode == "d" or mode == "drop":
-            return [int(x) for x in new_pcs if x == int(x)]
-        elif mode == "c" or mode == "ceil" or mode == "ceiling":
-            return [ceil(x) for x in new_pcs]
-        elif mode == "r" or mode == "round":
-            return [round(x) for x in new_pcs]
-        elif mode == "f" or mode == "floor":
-            return [floor(x) for x in new_pcs]
-        else:
-            raise ValueError("invalid mode")
+            return [images[pc] for pc in self.pcs if images[pc] is not None]
+        return [images[pc] for pc in self.pcs]
 
     def _minimized_univ(self):
         divisor = gcd(*self.pcs, self.univ)
@@ -64,66 +74,126 @@ class PitchClasses:
 
 
 class PitchClassSet(PitchClasses):
+    """A set of pitch classes, stored as an integer bitmask in which bit n is
+    set if pitch class n is a member. The sorted members are only listed when
+    .pcs is asked for, and .pcs returns a new list each time."""
+
+    __slots__ = ("_mask", "_pcs", "_scaled_masks")
+
+    @classmethod
+    def _from_mask(cls, mask, univ):
+        "return a new PitchClassSet with the given bitmask, skipping set_pcs"
+        pc_set = cls.__new__(cls)
+        pc_set.univ = univ
+        pc_set._set_mask(mask)
+        return pc_set
+
+    def _set_mask(self, mask):
+        self._mask = mask
+        self._pcs = None
+        self._scaled_masks = None
+
     def set_pcs(self, pcs):
-        pcs = [pc % self.univ for pc in pcs]
-        self.pcs = sorted(set(pcs))
-        self.cardinality = len(self.pcs)
+        self._set_mask(_pcs_to_mask(pcs, self.univ))
+
+    def _sorted_pcs(self):
+        "return the sorted members, a tuple cached until the set is changed"
+        if self._pcs is None:
+            self._pcs = tuple(_mask_to_pcs(self._mask))
+        return self._pcs
+
+    @property
+    def pcs(self):
+        """a new sorted list of the members; changing it does not change the
+        set, which is changed by assigning to .pcs instead"""
+        return list(self._sorted_pcs())
+
+    @pcs.setter
+    def pcs(self, pcs):
+        self.set_pcs(pcs)
+
+    @property
+    def cardinality(self):
+        return self._mask.bit_count()
 
     def __repr__(self):
         return "PitchClassSet {}{}".format(self.univ, self.pcs)
 
-    def _pcs_in_normalized_univ(self, *pc_sets):
-        """This function allows comparison of multiple pc_sets with
-        different pc universe sizes. Returns a tuple consisting of:
-        - lists of pcs in the new pc universe
+    def __len__(self):
+        return self.cardinality
+
+    def __iter__(self):
+        return iter(self._sorted_pcs())
+
+    def __contains__(self, pc):
+        return bool(self._mask >> (pc % self.univ) & 1)
+
+    def _mask_in_univ(self, univ):
+        """return the bitmask of the set in univ, a multiple of .univ; bitmasks
+        in other universes are cached until the set is changed"""
+        if univ == self.univ:
+            return self._mask
+        if self._scaled_masks is None:
+            self._scaled_masks = {}
+        mask = self._scaled_masks.get(univ)
+        if mask is None:
+            mask = _spread_mask(self._mask, self.univ, univ // self.univ)
+            self._scaled_masks[univ] = mask
+        return mask
+
+    def _masks_in_normalized_univ(self, pc_set):
+        """This function allows comparison of pc_sets with different pc
+        universe sizes. Returns a tuple consisting of:
+        - the bitmasks of self and pc_set in the new pc universe
         - the size of the new pc universe"""
-        univs = [pc_set.univ for pc_set in pc_sets]
-        comp_univ = lcm(*univs)
-        return (pc_set._as_univ(comp_univ) for pc_set in pc_sets), comp_univ
+        if pc_set.univ == self.univ:
+            return self._mask, pc_set._mask, self.univ
+        comp_univ = lcm(self.univ, pc_set.univ)
+        return self._mask_in_univ(comp_univ), pc_set._mask_in_univ(comp_univ), comp_univ
 
     def __lt__(self, pc_set):
-        (self_pcs, arg_pcs), _ = self._pcs_in_normalized_univ(self, pc_set)
-        return self_pcs < arg_pcs
+        self_mask, arg_mask, _ = self._masks_in_normalized_univ(pc_set)
+        return _compared_masks(self_mask, arg_mask) < 0
 
     def __le__(self, pc_set):
-        (self_pcs, arg_pcs), _ = self._pcs_in_normalized_univ(self, pc_set)
-        return self_pcs <= arg_pcs
+        self_mask, arg_mask, _ = self._masks_in_normalized_univ(pc_set)
+        return _compared_masks(self_mask, arg_mask) <= 0
 
     def __eq__(self, pc_set):
-        (self_pcs, arg_pcs), _ = self._pcs_in_normalized_univ(self, pc_set)
-        return self_pcs == arg_pcs
+        if not isinstance(pc_set, PitchClassSet):
+            return NotImplemented
+        self_mask, arg_mask, _ = self._masks_in_normalized_univ(pc_set)
+        return self_mask == arg_mask
 
     def __ne__(self, pc_set):
-        (self_pcs, arg_pcs), _ = self._pcs_in_normalized_univ(self, pc_set)
-        return self_pcs != arg_pcs
+        if not isinstance(pc_set, PitchClassSet):
+            return NotImplemented
+        self_mask, arg_mask, _ = self._masks_in_normalized_univ(pc_set)
+        return self_mask != arg_mask
 
     def __gt__(self, pc_set):
-        (self_pcs, arg_pcs), _ = self._pcs_in_normalized_univ(self, pc_set)
-        return self_pcs > arg_pcs
+        self_mask, arg_mask, _ = self._masks_in_normalized_univ(pc_set)
+        return _compared_masks(self_mask, arg_mask) > 0
 
     def __ge__(self, pc_set):
-        (self_pcs, arg_pcs), _ = self._pcs_in_normalized_univ(self, pc_set)
-        return self_pcs >= arg_pcs
+        self_mask, arg_mask, _ = self._masks_in_normalized_univ(pc_set)
+        return _compared_masks(self_mask, arg_mask) >= 0
 
     def __sub__(self, pc_set):
-        (self_pcs, arg_pcs), univ = self._pcs_in_normalized_univ(self, pc_set)
-        difference = set(self_pcs) - set(arg_pcs)
-        return PitchClassSet(difference, univ)
+        self_mask, arg_mask, univ = self._masks_in_normalized_univ(pc_set)
+        return PitchClassSet._from_mask(self_mask & ~arg_mask, univ)
 
     def __and__(self, pc_set):
-        (self_pcs, arg_pcs), univ = self._pcs_in_normalized_univ(self, pc_set)
-        sum_ = set(self_pcs) & set(arg_pcs)
-        return PitchClassSet(sum_, univ)
+        self_mask, arg_mask, univ = self._masks_in_normalized_univ(pc_set)
+        return PitchClassSet._from_mask(self_mask & arg_mask, univ)
 
     def __xor__(self, pc_set):
-        (self_pcs, arg_pcs), univ = self._pcs_in_normalized_univ(self, pc_set)
-        sym_diff = set(self_pcs) ^ set(arg_pcs)
-        return PitchClassSet(sym_diff, univ)
+        self_mask, arg_mask, univ = self._masks_in_normalized_univ(pc_set)
+        return PitchClassSet._from_mask(self_mask ^ arg_mask, univ)
 
     def __or__(self, pc_set):
-        (self_pcs, arg_pcs), univ = self._pcs_in_normalized_univ(self, pc_set)
-        union = set(self_pcs) | set(arg_pcs)
-        return PitchClassSet(union, univ)
+        self_mask, arg_mask, univ = self._masks_in_normalized_univ(pc_set)
+        return PitchClassSet._from_mask(self_mask | arg_mask, univ)
 
     def _check_valid_pitch_class_set(self, pc_set):
         if not isinstance(pc_set, PitchClassSet):
@@ -135,52 +205,172 @@ class PitchClassSet(PitchClasses):
         return None
 
     def transposed(self, transposition):
-        return PitchClassSet(self._transposed(transposition), univ=self.univ)
+        mask = _rotated(self._mask, transposition, self.univ)
+        return PitchClassSet._from_mask(mask, self.univ)
 
     def transpose(self, transposition):
-        self.set_pcs(self._transposed(transposition))
+        self._set_mask(_rotated(self._mask, transposition, self.univ))
 
     def inverted(self, axis):
-        return PitchClassSet(self._inverted(axis), univ=self.univ)
+        mask = _rotated(_reflected(self._mask, self.univ), axis, self.univ)
+        return PitchClassSet._from_mask(mask, self.univ)
 
     def invert(self, axis):
-        self.set_pcs(self._inverted(axis))
+        self._set_mask(_rotated(_reflected(self._mask, self.univ), axis, self.univ))
 
     def m_transformed(self, multiplier):
-        return PitchClassSet(self._m_transformed(multiplier), univ=self.univ)
+        mask = _multiplied_mask(self._mask, multiplier, self.univ)
+        return PitchClassSet._from_mask(mask, self.univ)
 
     def m_transform(self, multiplier):
-        self.set_pcs(self._m_transformed(multiplier))
+        self._set_mask(_multiplied_mask(self._mask, multiplier, self.univ))
 
     def as_univ(self, new_univ, mode="e"):
-        return PitchClassSet(self._as_univ(new_univ, mode=mode), univ=new_univ)
+        mask = _rescaled_mask(self._mask, self.univ, new_univ, mode=mode)
+        return PitchClassSet._from_mask(mask, new_univ)
 
     def set_univ(self, new_univ, mode="e"):
-        new_pcs = self._as_univ(new_univ, mode=mode)
+        mask = _rescaled_mask(self._mask, self.univ, new_univ, mode=mode)
         self.univ = new_univ
-        self.set_pcs(new_pcs)
+        self._set_mask(mask)
 
     def complement(self):
-        comp = [pc for pc in range(self.univ) if pc not in self.pcs]
-        return PitchClassSet(comp, univ=self.univ)
+        mask = ~self._mask & ((1 << self.univ) - 1)
+        return PitchClassSet._from_mask(mask, self.univ)
 
     def vector(self):
-        vec = [0] * (self.univ - 1)
-        # calculate interval for each pair of notes
-        for i, note1 in enumerate(self.pcs):
-            for j, note2 in enumerate(self.pcs):
-                if j <= i:
-                    continue
-                else:
-                    interval = (note1 - note2) % self.univ
-                    vec[interval - 1] += 1
-        # invert large intervals
-        for i in range(len(vec) // 2):
-            vec[i] += vec.pop()
-        return IntervalVector(vec, univ=self.univ)
+        return IntervalVector(_interval_counts(self._mask, self.univ), univ=self.univ)
+
+    def normal_form(self):
+        "return the pcs of the set in (Rahn) normal order"
+        if not self._mask:
+            return PitchClassSequence([], univ=self.univ)
+        prime = _prime_mask(self._mask, self.univ, "Tn")
+        start = _normal_start(self._mask, self.univ)
+        normal = [(start + pc) % self.univ for pc in _mask_to_pcs(prime)]
+        return PitchClassSequence(normal, univ=self.univ)
+
+    def prime_form(self, equivalence="TnI"):
+        prime = _prime_mask(self._mask, self.univ, equivalence)
+        return PitchClassSet._from_mask(prime, self.univ)
+
+    def set_class(self, equivalence="TnI"):
+        """return a name for the set class of the set: its Forte name in a
+        universe of size 12 (with A or B appended for Tn-types of sets that
+        are not inversionally symmetric), or its cardinality and prime form
+        in other universes"""
+        prime = _prime_mask(self._mask, self.univ, equivalence)
+        if self.univ != 12:
+            pcs = ",".join(str(pc) for pc in _mask_to_pcs(prime))
+            return "{}-[{}]".format(self.cardinality, pcs)
+        name = _forte_names()[_prime_mask(prime, 12, "TnI")]
+        if equivalence == "Tn":
+            inverted_prime = _prime_mask(_reflected(prime, 12), 12, "Tn")
+            if inverted_prime < prime:
+                name += "B"
+            elif inverted_prime > prime:
+                name += "A"
+        return name
+
+    def voice_leading(self, pc_set, norm="L1"):
+        """return the size of the smallest voice leading from the set to pc_set,
+        in steps of the set's universe, measured by norm: "L1" (the total
+        displacement of the voices), "L2" (its Euclidean length) or "Linf" (the
+        largest displacement of a voice). If the sets differ in cardinality,
+        pcs may be doubled."""
+        _check_norm(norm)
+        self_mask, arg_mask, univ = self._masks_in_normalized_univ(pc_set)
+        cost = _voice_leading_cost(self_mask, arg_mask, univ, norm)
+        return _voice_leading_distance(cost, norm, univ, self.univ)
+
+    def smoothest_transposition(self, pc_set, norm="L1"):
+        """return the transposition of pc_set, in its own universe, to which the
+        set has the smallest voice leading, and the size of that voice leading"""
+        _check_norm(norm)
+        self_mask, arg_mask, univ = self._masks_in_normalized_univ(pc_set)
+        step = univ // pc_set.univ
+        costs = [
+            _voice_leading_cost(
+                self_mask, _rotated(arg_mask, t * step, univ), univ, norm
+            )
+            for t in range(pc_set.univ)
+        ]
+        cost = min(costs)
+        distance = _voice_leading_distance(cost, norm, univ, self.univ)
+        return costs.index(cost), distance
+
+    def _symmetries(self, multiplication):
+        """return the (multiplier, transposition) pairs of the operations that
+        map the set onto itself"""
+        return _pair_transformations(
+            self._mask, self._mask, self.univ, multiplication, False
+        )
+
+    def symmetries(self, multiplication=False):
+        """return the Transformations that map the set onto itself: each Tn
+        and TnI, and with multiplication each TnMm for m coprime to the
+        universe"""
+        return [
+            Transformation(multiplier, transposition, self.univ)
+            for multiplier, transposition in self._symmetries(multiplication)
+        ]
+
+    def degree_of_symmetry(self, multiplication=False):
+        "return the number of operations that map the set onto itself"
+        return len(self._symmetries(multiplication))
+
+    def transformations_to(self, pc_set, multiplication=False):
+        """return the Transformations (Tn and TnI, and with multiplication
+        each TnMm) that map the set onto pc_set, in their common universe"""
+        return _transformations_between(self, pc_set, multiplication, False)
+
+    def transformations_into(self, pc_set, multiplication=False):
+        """return the Transformations that map the set into pc_set, that is,
+        onto a subset of it"""
+        return _transformations_between(self, pc_set, multiplication, True)
+
+    def injection(self, pc_set, transformation):
+        """return Lewin's injection function of the set and pc_set at
+        transformation: the number of pcs of the set that it maps into
+        pc_set"""
+        self_mask, arg_mask, univ = self._masks_in_normalized_univ(pc_set)
+        transformation._check_univ(univ)
+        if transformation.is_invertible():
+            image = transformation(PitchClassSet._from_mask(self_mask, univ))
+            return (image._mask & arg_mask).bit_count()
+        return sum(arg_mask >> transformation(pc) & 1 for pc in _mask_to_pcs(self_mask))
+
+    def similarity(self, pc_set, measure="SIM"):
+        """return a measure of the similarity of the set and pc_set, taken from
+        their interval vectors or the set classes (TnI) of their subsets:
+        - "SIM" (Morris): the total absolute difference of their interval
+          vectors, 0 if the vectors are the same
+        - "IcVSIM" (Isaacson): the standard deviation of those differences
+        - "ATMEMB" (Rahn): the proportion of the subsets of two or more pcs
+          of either set in set classes embedded in both, 1 for sets of the
+          same class
+        - "REL" (Lewin): the sum over set classes of the geometric mean of the
+          numbers of subsets of each set in the class, normalized to 1 for
+          sets of the same class
+        - "Rp" (Forte): 1.0 if the sets have the same cardinality n and a set
+          class of subsets of cardinality n - 1 in common, and otherwise 0.0"""
+        _check_measure(measure)
+        self_mask, arg_mask, univ = self._masks_in_normalized_univ(pc_set)
+        prime = _prime_mask(self_mask, univ, "TnI")
+        return _class_similarity(
+            prime, _prime_mask(arg_mask, univ, "TnI"), univ, measure
+        )
+
+    def is_limited_transposition(self):
+        """return whether some transposition other than T0 maps the set onto
+        itself, as in Messiaen's modes of limited transposition"""
+        return _transposition_period(self._mask, self.univ) < self.univ
 
     def copy(self):
-        return PitchClassSet(pcs=self.pcs, univ=self.univ)
+        return PitchClassSet._from_mask(self._mask, self.univ)
+
+    def frozen(self):
+        return FrozenPitchClassSet._from_mask(self._mask, self.univ)
 
     def minimized_univ(self):
         new_pcs, new_univ = self._minimized_univ()
@@ -192,37 +382,126 @@ class PitchClassSet(PitchClasses):
         self.pcs = new_pcs
 
 
+class FrozenPitchClassSet(PitchClassSet):
+    """An immutable, hashable PitchClassSet. Sets that are equal have equal
+    hashes even when their universes differ, since the hash is taken from the
+    set in its minimized universe."""
+
+    __slots__ = ("_hash",)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_hash", None) is not None and name not in _CACHE_ATTRIBUTES:
+            raise TypeError("FrozenPitchClassSet objects cannot be changed")
+        super().__setattr__(name, value)
+
+    def _set_mask(self, mask):
+        super()._set_mask(mask)
+        self._hash = hash(("set",) + _minimized_mask(mask, self.univ))
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return type(self), (self.pcs, self.univ)
+
+    def __repr__(self):
+        return "FrozenPitchClassSet {}{}".format(self.univ, self.pcs)
+
+    def frozen(self):
+        return self
+
+
+_CACHE_ATTRIBUTES = ("_pcs", "_scaled_masks")
+
+
 class PitchClassSequence(PitchClasses):
+    """A sequence of pcs stored in a typed array sized to its universe.
+    Slicing returns a view sharing that array, which is copied only if the
+    view is changed. .pcs returns a new list of the pcs each time."""
+
+    __slots__ = ("_data", "_view")
+
     def set_pcs(self, pcs):
-        self.pcs = [pc % self.univ for pc in pcs]
-        self.length = len(self.pcs)
+        self._data = _pc_buffer((pc % self.univ for pc in pcs), self.univ)
+        self._view = None
+
+    @classmethod
+    def _from_data(cls, data, univ, view=None):
+        pc_sequence = cls.__new__(cls)
+        pc_sequence.univ = univ
+        pc_sequence._data = data
+        pc_sequence._view = view
+        return pc_sequence
+
+    @property
+    def pcs(self):
+        return list(self._values())
+
+    @pcs.setter
+    def pcs(self, pcs):
+        self.set_pcs(pcs)
+
+    @property
+    def length(self):
+        return len(self)
+
+    def _values(self):
+        "return the buffer of pcs, which is shared unless the sequence is a view"
+        view = self._view
+        if view is None:
+            return self._data
+        if not view:
+            return self._data[0:0]
+        stop = view.stop if view.stop >= 0 else None  # stepping down to pc 0
+        return self._data[view.start : stop : view.step]
+
+    def _own(self):
+        "copy the pcs of a view into a buffer of its own before changing them"
+        if self._view is not None:
+            self._data = self._values()
+            self._view = None
 
     def __repr__(self):
         return "PitchClassSequence {}{}".format(self.univ, self.pcs)
 
+    def __len__(self):
+        if self._view is None:
+            return len(self._data)
+        return len(self._view)
+
+    def __iter__(self):
+        if self._view is None:
+            return iter(self._data)
+        return map(self._data.__getitem__, self._view)
+
+    def __getitem__(self, index):
+        view = range(len(self._data)) if self._view is None else self._view
+        if isinstance(index, slice):
+            return PitchClassSequence._from_data(self._data, self.univ, view[index])
+        return self._data[view[index]]
+
     def __add__(self, pc_sequence):
         exception = self._check_valid_pitch_class_sequence(pc_sequence)
         if exception is not None:
             raise exception
         else:
-            combined_sequence = self.pcs + pc_sequence.pcs
-            return PitchClassSequence(combined_sequence, univ=self.univ)
+            combined_data = self._values() + pc_sequence._values()
+            return PitchClassSequence._from_data(combined_data, self.univ)
 
     def extend(self, pc_sequence):
         exception = self._check_valid_pitch_class_sequence(pc_sequence)
         if exception is not None:
             raise exception
         else:
-            combined_sequence = self.pcs + pc_sequence.pcs
-            self.set_pcs(combined_sequence)
+            self._own()
+            self._data.extend(pc_sequence._values())
 
     def append(self, pc):
         if not isinstance(pc, int):
             raise TypeError("Only an int can be added to a PitchClassSequence")
         else:
-            pc_sequence = self.pcs
-            pc_sequence.append(pc)
-            self.set_pcs(pc_sequence)
+            self._own()
+            self._data.append(pc % self.univ)
 
     def _check_valid_pitch_class_sequence(self, pc_sequence):
         if not isinstance(pc_sequence, PitchClassSequence):
@@ -235,29 +514,53 @@ class PitchClassSequence(PitchClasses):
             )
         return None
 
+    def _mapped(self, image):
+        """return a buffer of image(pc) % univ for each pc, translating bytes
+        through a table of the images of the universe where that is shorter"""
+        data = self._values()
+        if isinstance(data, array) and data.typecode == "B" and len(data) > self.univ:
+            table = bytes(image(pc) % self.univ for pc in range(self.univ))
+            return array("B", data.tobytes().translate(table.ljust(256, b"\0")))
+        return _pc_buffer(map(self.univ.__rmod__, map(image, data)), self.univ)
+
+    def _transposed(self, transposition):
+        return list(self._mapped(partial(add, transposition)))
+
+    def _inverted(self, axis):
+        return list(self._mapped(partial(sub, axis)))
+
+    def _m_transformed(self, multiplier):
+        return list(self._mapped(partial(mul, multiplier)))
+
+    def _retrograded(self):
+        return list(self._values()[::-1])
+
     def transposed(self, transposition):
-        return PitchClassSequence(self._transposed(transposition), univ=self.univ)
+        data = self._mapped(partial(add, transposition))
+        return PitchClassSequence._from_data(data, self.univ)
 
     def transpose(self, transposition):
-        self.set_pcs(self._transposed(transposition))
+        self._data, self._view = self._mapped(partial(add, transposition)), None
 
     def inverted(self, axis):
-        return PitchClassSequence(self._inverted(axis), univ=self.univ)
+        data = self._mapped(partial(sub, axis))
+        return PitchClassSequence._from_data(data, self.univ)
 
     def invert(self, axis):
-        self.set_pcs(self._inverted(axis))
+        self._data, self._view = self._mapped(partial(sub, axis)), None
 
     def m_transformed(self, multiplier):
-        return PitchClassSequence(self._m_transformed(multiplier), univ=self.univ)
+        data = self._mapped(partial(mul, multiplier))
+        return PitchClassSequence._from_data(data, self.univ)
 
     def m_transform(self, multiplier):
-        self.set_pcs(self._m_transformed(multiplier))
+        self._data, self._view = self._mapped(partial(mul, multiplier)), None
 
     def retrograded(self):
-        return PitchClassSequence(self._retrograded(), univ=self.univ)
+        return PitchClassSequence._from_data(self._values()[::-1], self.univ)
 
     def retrograde(self):
-        self.set_pcs(self._retrograded())
+        self._data, self._view = self._values()[::-1], None
 
     def as_univ(self, new_univ, mode="e"):
         return PitchClassSequence(self._as_univ(new_univ, mode=mode), univ=new_univ)
@@ -268,17 +571,20 @@ class PitchClassSequence(PitchClasses):
         self.set_pcs(new_pcs)
 
     def pc_inventory(self):
-        inventory = set(self.pcs)
+        inventory = set(self._values())
         return PitchClassSet(inventory, self.univ)
 
     def intervals(self):
-        ivals = []
-        for i in range(1, self.length):
-            ivals.append((self.pcs[i] - self.pcs[i - 1]) % self.univ)
-        return IntervalSequence(ivals, self.univ)
+        data = self._values()
+        ivals = map(self.univ.__rmod__, map(sub, data[1:], data))
+        return IntervalSequence(list(ivals), self.univ)
 
     def copy(self):
-        return PitchClassSequence(pcs=self.pcs, univ=self.univ)
+        data = self._values()
+        return PitchClassSequence._from_data(data[:], self.univ)
+
+    def frozen(self):
+        return FrozenPitchClassSequence(pcs=self._values(), univ=self.univ)
 
     def minimized_univ(self):
         new_pcs, new_univ = self._minimized_univ()
@@ -290,17 +596,113 @@ class PitchClassSequence(PitchClasses):
         self.pcs = new_pcs
 
 
+class FrozenPitchClassSequence(PitchClassSequence):
+    """An immutable, hashable PitchClassSequence. Sequences that are equal
+    have equal hashes even when their universes differ."""
+
+    __slots__ = ("_hash",)
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "_hash"):
+            raise TypeError("FrozenPitchClassSequence objects cannot be changed")
+        super().__setattr__(name, value)
+
+    def set_pcs(self, pcs):
+        super().set_pcs(pcs)
+        self._hash = hash(("sequence",) + _minimized_pcs(self._data, self.univ))
+
+    def __eq__(self, pc_sequence):
+        """frozen sequences are equal if they have the same pcs in the same
+        order once scaled to a common pc universe"""
+        if not isinstance(pc_sequence, FrozenPitchClassSequence):
+            return NotImplemented
+        if pc_sequence.univ == self.univ:
+            return self._values() == pc_sequence._values()
+        comp_univ = lcm(self.univ, pc_sequence.univ)
+        return self._as_univ(comp_univ) == pc_sequence._as_univ(comp_univ)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return type(self), (self.pcs, self.univ)
+
+    def __repr__(self):
+        return "FrozenPitchClassSequence {}{}".format(self.univ, self.pcs)
+
+    def append(self, pc):
+        raise TypeError("FrozenPitchClassSequence objects cannot be changed")
+
+    def extend(self, pc_sequence):
+        raise TypeError("FrozenPitchClassSequence objects cannot be changed")
+
+    def frozen(self):
+        return self
+
+
+class InternPool:
+    """A pool of frozen pitch class objects, bounded to maxsize entries.
+    .intern() returns the pooled object equal to its argument (adding a
+    frozen copy of the argument if there is none), so that repeated sets and
+    sequences share one object. The least recently used objects are evicted
+    first."""
+
+    def __init__(self, maxsize=1 << 16):
+        self.maxsize = maxsize
+        self._pool = OrderedDict()
+
+    def __repr__(self):
+        return "InternPool {}/{}".format(len(self._pool), self.maxsize)
+
+    def __len__(self):
+        return len(self._pool)
+
+    def __contains__(self, pc_object):
+        return pc_object.frozen() in self._pool
+
+    def intern(self, pc_object):
+        frozen = pc_object.frozen()
+        pooled = self._pool.get(frozen)
+        if pooled is None:
+            pooled = self._pool[frozen] = frozen
+            if len(self._pool) > self.maxsize:
+                self._pool.popitem(last=False)
+        else:
+            self._pool.move_to_end(frozen)
+        return pooled
+
+    def clear(self):
+        self._pool.clear()
+
+
 class IntervalVector:
+    """The interval-class counts of a set. Vectors are immutable and hashable:
+    .intervals returns a new list of the counts."""
+
+    __slots__ = ("univ", "_counts")
+
     def __init__(self, intervals, univ=0):
         if univ == 0:
             self.univ = PC_UNIVERSE
         else:
             self.univ = univ
-        self.intervals = intervals
+        self._counts = tuple(intervals)
 
     def __repr__(self):
         return "IntervalVector {}{}".format(self.univ, self.intervals)
 
+    def __eq__(self, other):
+        if not isinstance(other, IntervalVector):
+            return NotImplemented
+        return self.univ == other.univ and self._counts == other._counts
+
+    def __hash__(self):
+        return hash((self.univ, self._counts))
+
+    @property
+    def intervals(self):
+        return list(self._counts)
+
 
 class IntervalSequence:
     def __init__(self, intervals, univ=0):
@@ -313,14 +715,44 @@ class IntervalSequence:
     def __repr__(self):
         return "IntervalSequence {}{}".format(self.univ, self.intervals)
 
+    @property
+    def intervals(self):
+        "a new list of the intervals; assign to this to change them"
+        return list(self._intervals)
+
+    @intervals.setter
+    def intervals(self, intervals):
+        self._intervals = tuple(intervals)
+        self._offsets = None
+
+    @property
+    def univ(self):
+        return self._univ
+
+    @univ.setter
+    def univ(self, univ):
+        self._univ = univ
+        self._offsets = None
+
+    def _prefix_sums(self):
+        """return a PitchClassSequence of the running sums of the intervals,
+        beginning with 0: the melody starting on pc 0. It is computed once and
+        kept until the intervals or the universe are replaced."""
+        if self._offsets is None:
+            sums = map(self.univ.__rmod__, accumulate(self._intervals, initial=0))
+            self._offsets = PitchClassSequence._from_data(
+                _pc_buffer(sums, self.univ), self.univ
+            )
+        return self._offsets
+
+    def lazy_melody(self, starting_pc):
+        return LazyMelody(self._prefix_sums(), starting_pc)
+
     def melody(self, starting_pc):
-        mel = [starting_pc]
-        for i in self.intervals:
-            mel.append((mel[-1] + i) % self.univ)
-        return PitchClassSequence(mel, self.univ)
+        return self.lazy_melody(starting_pc).realize()
 
     def _inverted(self):
-        return [(0 - i) % self.univ for i in self.intervals]
+        return [(0 - i) % self.univ for i in self._intervals]
 
     def inverted(self):
         return IntervalSequence(self._inverted(), univ=self.univ)
@@ -339,17 +771,14 @@ class IntervalSequence:
         self.intervals = self._retrograded()
 
     def _as_univ(self, new_univ):
-        multiplier = new_univ / self.univ
-        new_intervals = [x * multiplier for x in self.intervals]
-        for i in new_intervals:
-            if int(i) != i:
-                err = round(i / multiplier)
+        for x in self.intervals:
+            if x * new_univ % self.univ:
                 raise ValueError(
                     "interval {} does not exist in a universe of size {}.".format(
-                        err, new_univ
+                        x, new_univ
                     )
                 )
-        return [int(x) for x in new_intervals]
+        return [x * new_univ // self.univ for x in self.intervals]
 
     def as_univ(self, new_univ):
         return IntervalSequence(self._as_univ(new_univ), new_univ)
@@ -362,6 +791,43 @@ class IntervalSequence:
         return IntervalSequence(intervals=self.intervals, univ=self.univ)
 
 
+class LazyMelody:
+    """The melody made by an IntervalSequence from a starting pc, computed
+    only as needed from the running sums of the intervals. Melodies from
+    different starting pcs share those sums."""
+
+    def __init__(self, offsets, starting_pc):
+        self._offsets = offsets
+        self.univ = offsets.univ
+        self.starting_pc = starting_pc % self.univ
+
+    def __repr__(self):
+        return "LazyMelody {}[{} pcs from {}]".format(
+            self.univ, len(self), self.starting_pc
+        )
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._offsets[index].transposed(self.starting_pc)
+        return (self._offsets[index] + self.starting_pc) % self.univ
+
+    def __iter__(self):
+        pcs = map(partial(add, self.starting_pc), self._offsets)
+        return map(self.univ.__rmod__, pcs)
+
+    def rerooted(self, starting_pc):
+        return LazyMelody(self._offsets, starting_pc)
+
+    def transposed(self, transposition):
+        return LazyMelody(self._offsets, self.starting_pc + transposition)
+
+    def realize(self):
+        return self._offsets.transposed(self.starting_pc)
+
+
 class SetSequence:
     def __init__(self, pc_sets, univ=12):
         self.univ = univ
@@ -377,29 +843,2196 @@ class SetSequence:
         return "SetSequence {}{}".format(sets_repr, self.univ)
 
     def _parse_sets(self, inp):
-        sequence = []
         if not (isinstance(inp, list) or isinstance(inp, tuple)):
             t = type(inp)
             message = "pc_sets must be of type list or tuple; received {}".format(t)
             raise TypeError(message)
-        for element in inp:
-            if isinstance(element, PitchClassSet):
-                sequence.append(element.copy())
-            elif (
-                isinstance(element, list)
-                or isinstance(element, tuple)
-                or isinstance(element, set)
-            ):
-                sequence.append(PitchClassSet(element, univ=self.univ))
-            elif isinstance(element, int):
-                sequence.append(PitchClassSet([element], univ=self.univ))
+        return [_parse_set(element, self.univ) for element in inp]
+
+    def stream(self):
+        return SetStream(self.pc_sets, univ=self.univ)
+
+    def transformation_graph(self, multiplication=False, inclusion=False, span=None):
+        """return a dictionary mapping each pair of positions (i, j), i < j,
+        of sets at most span apart (by default, any distance) to the
+        Transformations that map set i onto (or if inclusion, into) set j,
+        omitting pairs that no Transformation connects"""
+        count = len(self.pc_sets)
+        span = count if span is None else span
+        positions = [
+            (i, j) for i in range(count) for j in range(i + 1, min(i + span + 1, count))
+        ]
+        pairs = [(self.pc_sets[i], self.pc_sets[j]) for i, j in positions]
+        found = transformations_between(pairs, multiplication, inclusion)
+        return {
+            position: transformations
+            for position, transformations in zip(positions, found)
+            if transformations
+        }
+
+
+class SetStream:
+    """A SetSequence read lazily from any iterable (or a file, with
+    from_file), one pc set at a time. Stages added with the methods below
+    each return a new SetStream, and nothing is read until the stream is
+    iterated, so a progression of any length is analysed in one pass, in
+    bounded memory, at the pace of whatever consumes it.
+
+    Stages before the first of set_classes, common_tones, voice_leadings and
+    windowed yield pc sets; those stages and any after them yield values."""
+
+    def __init__(self, source, univ=12, stages=()):
+        self.univ = univ
+        self._source = source
+        self._stages = tuple(stages)
+
+    def __repr__(self):
+        return "SetStream {}[{} stages]".format(self.univ, len(self._stages))
+
+    @classmethod
+    def from_file(cls, path, univ=12):
+        """return a SetStream of the sets in a text file with a set on each line,
+        as pcs separated by spaces or commas; blank lines and lines beginning
+        with # are skipped. The file is opened again each time the stream is
+        iterated."""
+        return cls(_SetFile(path), univ=univ)
+
+    def __iter__(self):
+        items = (_parse_set(element, self.univ) for element in self._source)
+        for stage in self._stages:
+            items = stage(items)
+        return items
+
+    def _with(self, stage):
+        stages = self._stages + (stage,)
+        return SetStream(self._source, univ=self.univ, stages=stages)
+
+    def map(self, func):
+        return self._with(partial(map, func))
+
+    def transposed(self, transposition):
+        return self.map(lambda pc_set: pc_set.transposed(transposition))
+
+    def inverted(self, axis):
+        return self.map(lambda pc_set: pc_set.inverted(axis))
+
+    def as_univ(self, new_univ, mode="e"):
+        return self.map(lambda pc_set: pc_set.as_univ(new_univ, mode=mode))
+
+    def prime_forms(self, equivalence="TnI"):
+        return self.map(lambda pc_set: pc_set.prime_form(equivalence))
+
+    def set_classes(self, equivalence="TnI"):
+        return self.map(lambda pc_set: pc_set.set_class(equivalence))
+
+    def common_tones(self):
+        "yield the number of pcs each set shares with the set before it"
+        return self._with(_common_tones)
+
+    def voice_leadings(self, norm="L1"):
+        "yield the size of the smallest voice leading to each set from the last"
+        _check_norm(norm)
+        return self._with(partial(_voice_leadings, norm=norm))
+
+    def windowed(self, size, func):
+        "yield func(window) for each window of size successive items"
+        return self._with(partial(_windowed, size=size, func=func))
+
+    def chunks(self, size):
+        "yield lists of up to size successive items"
+        items = iter(self)
+        while True:
+            chunk = list(islice(items, size))
+            if not chunk:
+                return
+            yield chunk
+
+    def collect(self):
+        "read the whole stream of sets into a SetSequence"
+        return SetSequence(list(self), univ=self.univ)
+
+
+class PitchClassSetArray:
+    """A batch of PitchClassSets in the same universe, stored as a list of
+    bitmasks so that each operation is applied to the whole batch in one pass
+    without creating a PitchClassSet for every member."""
+
+    __slots__ = ("univ", "masks")
+
+    def __init__(self, pc_sets=(), univ=0):
+        if univ == 0:
+            self.univ = PC_UNIVERSE
+        else:
+            self.univ = univ
+        self.masks = [_pcs_to_mask(pcs, self.univ) for pcs in pc_sets]
+
+    @classmethod
+    def _from_masks(cls, masks, univ):
+        pc_set_array = cls.__new__(cls)
+        pc_set_array.univ = univ
+        pc_set_array.masks = masks
+        return pc_set_array
+
+    @classmethod
+    def from_sets(cls, pc_sets):
+        "return a PitchClassSetArray sharing the bitmasks of a list of PitchClassSets"
+        univs = {pc_set.univ for pc_set in pc_sets}
+        if len(univs) > 1:
+            raise ValueError("All PitchClassSets must have the same value of .univ")
+        univ = univs.pop() if univs else PC_UNIVERSE
+        return cls._from_masks([pc_set._mask for pc_set in pc_sets], univ)
+
+    def to_sets(self):
+        "return a list of PitchClassSets sharing the bitmasks of the array"
+        return [PitchClassSet._from_mask(mask, self.univ) for mask in self.masks]
+
+    def __repr__(self):
+        return "PitchClassSetArray {}{}".format(
+            self.univ, [_mask_to_pcs(mask) for mask in self.masks]
+        )
+
+    def __len__(self):
+        return len(self.masks)
+
+    def __iter__(self):
+        return iter(self.to_sets())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PitchClassSetArray._from_masks(self.masks[index], self.univ)
+        return PitchClassSet._from_mask(self.masks[index], self.univ)
+
+    def _masks_in_normalized_univ(self, operand):
+        """return the masks of self and of operand (a PitchClassSetArray of the
+        same length, or a PitchClassSet to combine with every member) in a
+        shared pc universe, followed by the size of that universe"""
+        if isinstance(operand, PitchClassSet):
+            operand = PitchClassSetArray._from_masks([operand._mask], operand.univ)
+            broadcast = True
+        elif len(operand) == len(self):
+            broadcast = False
+        else:
+            raise ValueError("PitchClassSetArrays must have the same length")
+        if operand.univ == self.univ:
+            self_masks, arg_masks, comp_univ = self.masks, operand.masks, self.univ
+        else:
+            comp_univ = lcm(self.univ, operand.univ)
+            self_masks = self.as_univ(comp_univ).masks
+            arg_masks = operand.as_univ(comp_univ).masks
+        if broadcast:
+            arg_masks = arg_masks * len(self_masks)
+        return self_masks, arg_masks, comp_univ
+
+    def __sub__(self, operand):
+        self_masks, arg_masks, univ = self._masks_in_normalized_univ(operand)
+        masks = [a & ~b for a, b in zip(self_masks, arg_masks)]
+        return PitchClassSetArray._from_masks(masks, univ)
+
+    def __and__(self, operand):
+        self_masks, arg_masks, univ = self._masks_in_normalized_univ(operand)
+        masks = [a & b for a, b in zip(self_masks, arg_masks)]
+        return PitchClassSetArray._from_masks(masks, univ)
+
+    def __xor__(self, operand):
+        self_masks, arg_masks, univ = self._masks_in_normalized_univ(operand)
+        masks = [a ^ b for a, b in zip(self_masks, arg_masks)]
+        return PitchClassSetArray._from_masks(masks, univ)
+
+    def __or__(self, operand):
+        self_masks, arg_masks, univ = self._masks_in_normalized_univ(operand)
+        masks = [a | b for a, b in zip(self_masks, arg_masks)]
+        return PitchClassSetArray._from_masks(masks, univ)
+
+    def cardinalities(self):
+        return [mask.bit_count() for mask in self.masks]
+
+    def _mapped(self, images, univ):
+        tables = _mask_map_tables(images)
+        masks = [_mapped_mask(mask, tables) for mask in self.masks]
+        return PitchClassSetArray._from_masks(masks, univ)
+
+    def transposed(self, transposition):
+        masks = [_rotated(mask, transposition, self.univ) for mask in self.masks]
+        return PitchClassSetArray._from_masks(masks, self.univ)
+
+    def inverted(self, axis):
+        images = tuple((axis - pc) % self.univ for pc in range(self.univ))
+        return self._mapped(images, self.univ)
+
+    def m_transformed(self, multiplier):
+        images = tuple((pc * multiplier) % self.univ for pc in range(self.univ))
+        return self._mapped(images, self.univ)
+
+    def as_univ(self, new_univ, mode="e"):
+        if mode == "e" or mode == "exception":
+            for mask in self.masks:
+                _check_exact_rescaling(mask, self.univ, new_univ)
+        images = _univ_images(self.univ, new_univ, mode)
+        return self._mapped(images, new_univ)
+
+    def complement(self):
+        full = (1 << self.univ) - 1
+        masks = [full & ~mask for mask in self.masks]
+        return PitchClassSetArray._from_masks(masks, self.univ)
+
+    def vector(self):
+        return [
+            IntervalVector(_interval_counts(mask, self.univ), univ=self.univ)
+            for mask in self.masks
+        ]
+
+    def copy(self):
+        return PitchClassSetArray._from_masks(list(self.masks), self.univ)
+
+
+class Transformation:
+    """The operation pc -> multiplier * pc + transposition in a universe. Tn is
+    Transformation(1, n), TnI is Transformation(-1, n) and TnMm is
+    Transformation(m, n). Transformations compose with * (f * g applies g,
+    then f) and apply to pcs, PitchClassSets, PitchClassSequences and
+    PitchClassSetArrays in a single pass, so a chain of operations can be
+    composed first and applied once."""
+
+    __slots__ = ("multiplier", "transposition", "univ")
+
+    def __init__(self, multiplier=1, transposition=0, univ=0):
+        if univ == 0:
+            self.univ = PC_UNIVERSE
+        else:
+            self.univ = univ
+        self.multiplier = multiplier % self.univ
+        self.transposition = transposition % self.univ
+
+    @classmethod
+    def from_name(cls, name, univ=0):
+        "return the Transformation named Tn, TnI or TnMm"
+        match = re.fullmatch(r"T(\d+)(I|M(\d+))?", name)
+        if match is None:
+            raise ValueError(
+                "{} is not a name of the form Tn, TnI or TnMm".format(name)
+            )
+        transposition, operation, multiplier = match.groups()
+        if operation is None:
+            multiplier = 1
+        elif operation == "I":
+            multiplier = -1
+        return cls(int(multiplier), int(transposition), univ)
+
+    @property
+    def name(self):
+        if self.multiplier == 1:
+            return "T{}".format(self.transposition)
+        if self.multiplier == self.univ - 1:
+            return "T{}I".format(self.transposition)
+        return "T{}M{}".format(self.transposition, self.multiplier)
+
+    def __repr__(self):
+        return "Transformation {}[{}]".format(self.univ, self.name)
+
+    def __eq__(self, other):
+        if not isinstance(other, Transformation):
+            return NotImplemented
+        return (self.multiplier, self.transposition, self.univ) == (
+            other.multiplier,
+            other.transposition,
+            other.univ,
+        )
+
+    def __hash__(self):
+        return hash((self.multiplier, self.transposition, self.univ))
+
+    def _check_univ(self, univ):
+        if univ != self.univ:
+            raise ValueError(
+                "Transformation of universe {} cannot apply to universe {}".format(
+                    self.univ, univ
+                )
+            )
+
+    def __mul__(self, other):
+        if not isinstance(other, Transformation):
+            return NotImplemented
+        self._check_univ(other.univ)
+        return Transformation(
+            self.multiplier * other.multiplier,
+            self.multiplier * other.transposition + self.transposition,
+            self.univ,
+        )
+
+    def is_invertible(self):
+        return gcd(self.multiplier, self.univ) == 1
+
+    def inverse(self):
+        if not self.is_invertible():
+            raise ValueError("{} has no inverse".format(self.name))
+        multiplier = pow(self.multiplier, -1, self.univ)
+        return Transformation(multiplier, -multiplier * self.transposition, self.univ)
+
+    def __call__(self, target):
+        """return the image of target: a pc, PitchClassSet, PitchClassSequence
+        or PitchClassSetArray in the universe of the transformation"""
+        multiplier, transposition, univ = (
+            self.multiplier,
+            self.transposition,
+            self.univ,
+        )
+        if isinstance(target, int):
+            return (multiplier * target + transposition) % univ
+        self._check_univ(target.univ)
+        if isinstance(target, PitchClassSet):
+            mask = _multiplied_mask(target._mask, multiplier, univ)
+            return PitchClassSet._from_mask(_rotated(mask, transposition, univ), univ)
+        if isinstance(target, PitchClassSequence):
+            if multiplier == 1:
+                image = partial(add, transposition)
+            else:
+                image = lambda pc: multiplier * pc + transposition
+            return PitchClassSequence._from_data(target._mapped(image), univ)
+        if isinstance(target, PitchClassSetArray):
+            images = tuple(map(self, range(univ)))
+            return target._mapped(images, univ)
+        raise TypeError("cannot transform {}".format(type(target)))
+
+
+class RowMatrix:
+    """The 4 * univ forms of a row, a PitchClassSequence containing each pc of
+    its universe exactly once. Forms are named by type and number: Pn is the
+    row transposed to begin on n, In its inversion beginning on n, and Rn and
+    RIn are the retrogrades of Pn and In. Forms are only created when they
+    are asked for, and segment queries are answered from the bitmasks of the
+    segments of P0 and I0."""
+
+    def __init__(self, row, univ=0):
+        if isinstance(row, PitchClassSequence):
+            row, univ = row.pcs, row.univ
+        elif univ == 0:
+            univ = PC_UNIVERSE
+        if sorted(pc % univ for pc in row) != list(range(univ)):
+            raise ValueError("A row must contain each pitch class exactly once")
+        self.univ = univ
+        self.row = PitchClassSequence(row, univ=univ)
+        self._p0 = self.row.transposed(-self.row[0])
+        self._i0 = self._p0.inverted(0)
+        self._segment_masks = {}
+        self._segment_indexes = {}
+
+    def __repr__(self):
+        return "RowMatrix {}{}".format(self.univ, self.row.pcs)
+
+    def __getitem__(self, name):
+        return self.form(name)
+
+    def _parse_form(self, name):
+        "return the type and number of the form called name"
+        kind = name.rstrip("0123456789")
+        number = name[len(kind) :]
+        if kind not in _FORM_TYPES or not number:
+            raise ValueError("invalid form name {}".format(name))
+        return kind, int(number) % self.univ
+
+    def form(self, name):
+        kind, number = self._parse_form(name)
+        if kind in ("P", "R"):
+            pc_sequence = self._p0.transposed(number)
+        else:
+            pc_sequence = self._p0.inverted(number)
+        if kind in ("R", "RI"):
+            pc_sequence.retrograde()
+        return pc_sequence
+
+    def form_names(self):
+        return [
+            "{}{}".format(kind, number)
+            for kind in _FORM_TYPES
+            for number in range(self.univ)
+        ]
+
+    def matrix(self):
+        "return the rows of the matrix, beginning with the row and its inversion"
+        first = self.row[0]
+        return [self._p0.transposed(pc).pcs for pc in self._i0.transposed(first).pcs]
+
+    def _segments(self, inverted, length):
+        "return the bitmasks of the segments of P0 (or I0) of length, in order"
+        key = (inverted, length)
+        if key not in self._segment_masks:
+            pcs = (self._i0 if inverted else self._p0).pcs
+            mask = _pcs_to_mask(pcs[:length], self.univ)
+            masks = [mask]
+            for start in range(1, self.univ - length + 1):
+                mask ^= 1 << pcs[start - 1] | 1 << pcs[start + length - 1]
+                masks.append(mask)
+            self._segment_masks[key] = masks
+        return self._segment_masks[key]
+
+    def _form_segments(self, name, length):
+        "return the bitmasks of the segments of a form of length, in order"
+        kind, number = self._parse_form(name)
+        segments = self._segments(kind in ("I", "RI"), length)
+        masks = [_rotated(mask, number, self.univ) for mask in segments]
+        if kind in ("R", "RI"):
+            masks.reverse()
+        return masks
+
+    def combinatoriality(self):
+        """return a dict giving, for each type of form, the numbers of the forms
+        whose first hexachord is the complement of the row's first hexachord.
+        An Rn or RIn form qualifies when the first hexachord of Pn or In has
+        the same content as the row's, since its own first hexachord is then
+        the complement."""
+        if self.univ % 2:
+            raise ValueError("Hexachordal combinatoriality needs an even universe")
+        half = self.univ // 2
+        hexachord = self._segments(False, half)[0]
+        inverse = self._segments(True, half)[0]
+        complement = hexachord ^ ((1 << self.univ) - 1)
+        first = self.row[0]
+        found = {kind: [] for kind in _FORM_TYPES}
+        for n in range(self.univ):
+            number = (first + n) % self.univ
+            if _rotated(hexachord, n, self.univ) == complement:
+                found["P"].append(number)
+            if _rotated(inverse, n, self.univ) == complement:
+                found["I"].append(number)
+            if _rotated(hexachord, n, self.univ) == hexachord:
+                found["R"].append(number)
+            if _rotated(inverse, n, self.univ) == hexachord:
+                found["RI"].append(number)
+        for numbers in found.values():
+            numbers.sort()
+        return found
+
+    def is_all_combinatorial(self):
+        "return whether the row is P-, I-, R- and RI-combinatorial"
+        return all(self.combinatoriality().values())
+
+    def invariant_segments(self, form_a, form_b, length):
+        """return (start in form_a, start in form_b) for each pair of segments
+        of the given length with the same pc content"""
+        starts_b = {}
+        for start, mask in enumerate(self._form_segments(form_b, length)):
+            starts_b.setdefault(mask, []).append(start)
+        return [
+            (start_a, start_b)
+            for start_a, mask in enumerate(self._form_segments(form_a, length))
+            for start_b in starts_b.get(mask, [])
+        ]
+
+    def _segment_index(self, length):
+        """return a dict mapping Tn prime form bitmasks to the segments of P0
+        and I0 of length with that prime form"""
+        if length not in self._segment_indexes:
+            index = {}
+            for kind in ("P", "I"):
+                for start, mask in enumerate(self._segments(kind == "I", length)):
+                    prime = _prime_mask(mask, self.univ, "Tn")
+                    offset = _normal_start(mask, self.univ)
+                    index.setdefault(prime, []).append((kind, start, offset))
+            self._segment_indexes[length] = index
+        return self._segment_indexes[length]
+
+    def find_segment(self, pc_set):
+        """return (form name, start) for every segment of every form whose pc
+        content is pc_set, ordered by form name"""
+        mask = _rescaled_mask(pc_set._mask, pc_set.univ, self.univ)
+        length = mask.bit_count()
+        if length == 0:
+            return []
+        prime = _prime_mask(mask, self.univ, "Tn")
+        period = _transposition_period(prime, self.univ)
+        offset = _normal_start(mask, self.univ)
+        found = []
+        for kind, start, segment_offset in self._segment_index(length).get(prime, []):
+            retrograde_start = self.univ - length - start
+            first = offset - segment_offset
+            for n in range(first, first + self.univ, period):
+                number = n % self.univ
+                found.append((kind, number, start))
+                found.append(("R" + kind.lstrip("P"), number, retrograde_start))
+        found.sort(key=lambda item: (_FORM_TYPES.index(item[0]), item[1], item[2]))
+        return [("{}{}".format(kind, number), start) for kind, number, start in found]
+
+
+_FORM_TYPES = ("P", "I", "R", "RI")
+
+
+class ContainmentIndex:
+    """An index of PitchClassSets (a catalog of set classes, or any corpus)
+    for finding the indexed sets that contain, or are contained in, a query
+    set up to equivalence ("Tn", "TnI", or None for exact containment).
+
+    Each indexed set has an entry for each of its distinct transpositions
+    (and inversions), and for each pc the index keeps an integer whose bit n
+    is set if entry n contains that pc, with another integer per cardinality.
+    A query is answered by combining one of these integers per pc, and then
+    visiting only the entries that matched. So a query over N entries costs
+    about univ * N / 64 word operations, whatever the number of matches, and
+    then time proportional to the matches: the scan of the entries is done a
+    machine word at a time rather than avoided. The entries of sets added
+    since the last query are merged into the integers at the next one,
+    without reading the earlier entries again."""
+
+    def __init__(self, pc_sets=(), univ=0, equivalence="TnI"):
+        if univ == 0:
+            self.univ = PC_UNIVERSE
+        else:
+            self.univ = univ
+        if equivalence is not None:
+            _check_equivalence(equivalence)
+        self.equivalence = equivalence
+        self.pc_sets = []
+        self._entry_masks = []
+        self._entry_sets = []
+        self._postings = [0] * self.univ
+        self._layers = {}  # cardinality -> the entries of that cardinality
+        self._merged = 0  # the entries already in the postings and layers
+        self._all_entries = 0
+        for pc_set in pc_sets:
+            self.add(pc_set)
+
+    def __repr__(self):
+        return "ContainmentIndex {}[{} sets]".format(self.univ, len(self.pc_sets))
+
+    def __len__(self):
+        return len(self.pc_sets)
+
+    def add(self, pc_set):
+        mask = _rescaled_mask(pc_set._mask, pc_set.univ, self.univ)
+        if self.equivalence is None:
+            images = [mask]
+        elif self.equivalence == "Tn":
+            images = sorted({_rotated(mask, n, self.univ) for n in range(self.univ)})
+        else:
+            images = sorted(_tni_images(mask, self.univ))
+        self._entry_masks += images
+        self._entry_sets += [len(self.pc_sets)] * len(images)
+        self.pc_sets.append(pc_set)
+
+    def _merge(self):
+        """add the entries made since the last merge to the integer for each
+        pc and cardinality, by writing their masks as rows of binary digits
+        and reading the columns back as integers, shifted past the entries
+        already merged"""
+        start = self._merged
+        masks = self._entry_masks[start:]
+        rows = "".join(format(mask, "0{}b".format(self.univ)) for mask in masks)
+        for pc in range(self.univ):
+            column = int("0" + rows[self.univ - 1 - pc :: self.univ][::-1], 2)
+            self._postings[pc] |= column << start
+        cardinalities = "".join(chr(mask.bit_count()) for mask in masks)
+        counts = {ord(c) for c in set(cardinalities)}
+        for cardinality in counts:
+            table = {c: "1" if c == cardinality else "0" for c in counts}
+            layer = int(cardinalities.translate(table)[::-1], 2) << start
+            self._layers[cardinality] = self._layers.get(cardinality, 0) | layer
+        self._merged = len(self._entry_masks)
+        self._all_entries = (1 << self._merged) - 1
+
+    def _query_mask(self, pc_set):
+        if self._merged < len(self._entry_masks):
+            self._merge()
+        return _rescaled_mask(pc_set._mask, pc_set.univ, self.univ)
+
+    def _matching_sets(self, entries, cardinality):
+        "return the indexed sets with an entry in entries"
+        if cardinality is not None:
+            entries &= self._layers.get(cardinality, 0)
+        found = sorted({self._entry_sets[entry] for entry in _bit_positions(entries)})
+        return [self.pc_sets[i] for i in found]
+
+    def supersets(self, pc_set, cardinality=None):
+        """return the indexed sets (of the given cardinality) that contain
+        pc_set up to equivalence, in the order they were added"""
+        mask = self._query_mask(pc_set)
+        entries = self._all_entries
+        for pc in _mask_to_pcs(mask):
+            entries &= self._postings[pc]
+        return self._matching_sets(entries, cardinality)
+
+    def subsets(self, pc_set, cardinality=None):
+        """return the indexed sets (of the given cardinality) that are
+        contained in pc_set up to equivalence, in the order they were added"""
+        mask = self._query_mask(pc_set)
+        outside = 0
+        for pc in _mask_to_pcs(~mask & ((1 << self.univ) - 1)):
+            outside |= self._postings[pc]
+        return self._matching_sets(self._all_entries & ~outside, cardinality)
+
+
+class VectorIndex:
+    """An index of PitchClassSets by interval vector, built incrementally with
+    add(). Each vector's bucket records the prime form of every set in it, so
+    the sets sharing a vector, or only those Z-related to a set, are found with
+    one dictionary lookup."""
+
+    def __init__(self, pc_sets=(), univ=0):
+        if univ == 0:
+            self.univ = PC_UNIVERSE
+        else:
+            self.univ = univ
+        self._buckets = {}  # vector -> list of (prime mask, set)
+        for pc_set in pc_sets:
+            self.add(pc_set)
+
+    def __repr__(self):
+        return "VectorIndex {}[{} vectors]".format(self.univ, len(self._buckets))
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def _keys(self, pc_set):
+        mask = _rescaled_mask(pc_set._mask, pc_set.univ, self.univ)
+        vector = IntervalVector(_interval_counts(mask, self.univ), univ=self.univ)
+        return vector, _prime_mask(mask, self.univ)
+
+    def add(self, pc_set):
+        vector, prime = self._keys(pc_set)
+        self._buckets.setdefault(vector, []).append((prime, pc_set))
+
+    def vectors(self):
+        return list(self._buckets)
+
+    def sharing(self, pc_set):
+        """return the indexed sets with the same interval vector as pc_set (or
+        with the given IntervalVector)"""
+        if isinstance(pc_set, IntervalVector):
+            vector = pc_set
+        else:
+            vector = self._keys(pc_set)[0]
+        return [indexed for prime, indexed in self._buckets.get(vector, [])]
+
+    def z_partners(self, pc_set):
+        """return the indexed sets with the same interval vector as pc_set but
+        a different prime form"""
+        vector, prime = self._keys(pc_set)
+        bucket = self._buckets.get(vector, [])
+        cardinality = prime.bit_count()  # only the empty set and single pcs
+        return [  # share a vector across cardinalities
+            indexed
+            for other, indexed in bucket
+            if other != prime and other.bit_count() == cardinality
+        ]
+
+    def z_classes(self):
+        """return, for each vector shared by more than one set class, the prime
+        forms of those set classes"""
+        found = []
+        for bucket in self._buckets.values():
+            primes = sorted({prime for prime, indexed in bucket})
+            if len(primes) > 1 and primes[0].bit_count() > 1:
+                found.append(
+                    [PitchClassSet._from_mask(prime, self.univ) for prime in primes]
+                )
+        return found
+
+
+@lru_cache
+def _pc_typecode(univ):
+    "return the smallest array typecode holding the pcs of univ, or None"
+    for typecode in "BHIQ":
+        if univ <= 1 << 8 * array(typecode).itemsize:
+            return typecode
+    return None
+
+
+def _pc_buffer(pcs, univ):
+    "return a typed array of pcs, or a list if univ is too large for one"
+    typecode = _pc_typecode(univ)
+    if typecode is None:
+        return list(pcs)
+    return array(typecode, pcs)
+
+
+class VoiceLeadingIndex:
+    """An index of PitchClassSets in one universe for finding the sets with
+    the smallest voice leadings from a query set. Sets with the same pcs are
+    measured once per query. The distinct sets of each cardinality are kept
+    as sorted tuples of their pcs, so that the sets sharing a prefix of pcs
+    are a contiguous run: a query searches these runs best first, by a lower
+    bound on the distance of their sets (the distances of their pcs from the
+    nearest pcs of the query), so candidates come in bound order without the
+    rest of the index being visited, and the search stops once no remaining
+    candidate can be nearer than those found."""
+
+    def __init__(self, pc_sets=(), univ=0):
+        if univ == 0:
+            self.univ = PC_UNIVERSE
+        else:
+            self.univ = univ
+        self.pc_sets = []
+        self._masks = {}  # mask -> indices of sets in pc_sets
+        self._by_cardinality = None  # cardinality -> sorted tuples of pcs
+        for pc_set in pc_sets:
+            self.add(pc_set)
+
+    def __repr__(self):
+        return "VoiceLeadingIndex {}[{} sets]".format(self.univ, len(self.pc_sets))
+
+    def __len__(self):
+        return len(self.pc_sets)
+
+    def add(self, pc_set):
+        mask = _rescaled_mask(pc_set._mask, pc_set.univ, self.univ)
+        if mask not in self._masks:
+            self._by_cardinality = None
+        self._masks.setdefault(mask, []).append(len(self.pc_sets))
+        self.pc_sets.append(pc_set)
+
+    def _sorted_pcs(self):
+        """return the pcs of the distinct non-empty indexed sets as tuples, in
+        a sorted list for each cardinality, built again on the first query
+        after a new set is added"""
+        if self._by_cardinality is None:
+            by_cardinality = {}
+            for mask in self._masks:
+                if mask:
+                    pcs = tuple(_mask_to_pcs(mask))
+                    by_cardinality.setdefault(len(pcs), []).append(pcs)
+            for entries in by_cardinality.values():
+                entries.sort()
+            self._by_cardinality = by_cardinality
+        return self._by_cardinality
+
+    def _pc_costs(self, mask, norm):
+        """return the least cost under norm of moving each pc of the universe
+        to a pc of mask"""
+        costs = [0] * self.univ
+        reach = mask  # the pcs within r steps of mask
+        r = 0
+        while reach != (1 << self.univ) - 1:
+            r += 1
+            wider = (
+                reach | _rotated(reach, 1, self.univ) | _rotated(reach, -1, self.univ)
+            )
+            for pc in _mask_to_pcs(wider & ~reach):
+                costs[pc] = r * r if norm == "L2" else r
+            reach = wider
+        return costs
+
+    def _remaining_costs(self, costs, norm, size):
+        """return, for each pc, the least combined cost of up to size - 1 pcs
+        above it: lists whose jth item is the bound for j more pcs"""
+        combine = max if norm == "Linf" else add
+        remaining = [None] * self.univ
+        above = []  # the costs of the pcs above pc, sorted
+        for pc in range(self.univ - 1, -1, -1):
+            remaining[pc] = [0] + list(accumulate(above[: size - 1], combine))
+            insort(above, costs[pc])
+        return remaining
+
+    def _candidates(self, mask, norm, cardinality):
+        """yield each distinct indexed set (of the given cardinality) as a
+        tuple of its pcs with a lower bound on the cost of a voice leading to
+        it from mask, in order of the bound. A run's bound is the cost of
+        moving its shared pcs to the query, with the least cost of the pcs
+        its sets still have above them; a set's bound is the larger of its
+        own and that of moving each pc of the query to the set."""
+        costs = self._pc_costs(mask, norm)
+        combine = max if norm == "Linf" else add
+        by_cardinality = self._sorted_pcs()
+        sizes = [size for size in by_cardinality if cardinality in (None, size)]
+        if not sizes:
+            return
+        remaining = self._remaining_costs(costs, norm, max(sizes))
+        query = _mask_to_pcs(mask)
+        # each run is of the sets sharing their first depth pcs, with the cost
+        # of those pcs: (bound, start, stop, depth, cardinality, cost)
+        runs = [(0, 0, len(by_cardinality[size]), 0, size, 0) for size in sizes]
+        heapq.heapify(runs)
+        while runs:
+            bound, start, stop, depth, size, cost = heapq.heappop(runs)
+            entries = by_cardinality[size]
+            if depth > size:  # a set whose bound is complete
+                yield bound, entries[start]
+                continue
+            if depth == size:
+                pcs = entries[start]
+                reverse = _nearest_costs(query, pcs, self.univ, norm, combine)
+                heapq.heappush(
+                    runs, (max(bound, reverse), start, stop, depth + 1, size, cost)
+                )
+                continue
+            prefix = entries[start][:depth]
+            while start < stop:
+                pc = entries[start][depth]
+                end = bisect_left(entries, prefix + (pc + 1,), start, stop)
+                run_cost = combine(cost, costs[pc])
+                rest = remaining[pc][size - depth - 1]
+                run = (combine(run_cost, rest), start, end, depth + 1, size, run_cost)
+                heapq.heappush(runs, run)
+                start = end
+
+    def nearest(self, pc_set, k=1, norm="L1", cardinality=None):
+        """return (distance, set) pairs for the k indexed sets (of the given
+        cardinality) with the smallest voice leadings from pc_set, in steps of
+        the index's universe, nearest first"""
+        _check_norm(norm)
+        mask = _rescaled_mask(pc_set._mask, pc_set.univ, self.univ)
+        if not mask:
+            raise ValueError("There is no voice leading from an empty set")
+        found = []  # (cost, index) of the nearest sets so far
+        for bound, pcs in self._candidates(mask, norm, cardinality):
+            if len(found) >= k and bound > found[k - 1][0]:
+                break
+            other_mask = sum(1 << pc for pc in pcs)
+            cost = _voice_leading_cost(mask, other_mask, self.univ, norm)
+            found = heapq.nsmallest(
+                k, found + [(cost, i) for i in self._masks[other_mask]]
+            )
+        return [
+            (sqrt(cost) if norm == "L2" else cost, self.pc_sets[i]) for cost, i in found
+        ]
+
+    def nearest_many(self, pc_sets, k=1, norm="L1", cardinality=None):
+        "return the result of nearest() for each of pc_sets"
+        return [self.nearest(pc_set, k, norm, cardinality) for pc_set in pc_sets]
+
+
+class MotifIndex:
+    """An index of every motif in a corpus of PitchClassSequences: a suffix
+    automaton over their interval sequences, each closed by a separator of its
+    own so that no match spans two sequences. Following a motif's intervals
+    from the start state finds it up to transposition; inversion, retrograde
+    and multiplication are found by following each distinct transformation of
+    its intervals in turn."""
+
+    def __init__(self, pc_sequences=(), univ=0):
+        if univ == 0:
+            self.univ = PC_UNIVERSE
+        else:
+            self.univ = univ
+        self.pc_sequences = []
+        self._starts = []  # where each sequence's intervals begin in the text
+        self._size = 0  # symbols in the text so far
+        # the states of the automaton
+        self._lengths = [0]
+        self._links = [-1]
+        self._transitions = [{}]
+        self._ends = [-1]  # where a state's first occurrence ends in the text
+        self._clones = [False]
+        self._last = 0
+        self._children = None
+        for pc_sequence in pc_sequences:
+            self.add(pc_sequence)
+
+    def __repr__(self):
+        return "MotifIndex {}[{} sequences]".format(self.univ, len(self.pc_sequences))
+
+    def __len__(self):
+        return len(self.pc_sequences)
+
+    def add(self, pc_sequence):
+        if pc_sequence.univ != self.univ:
+            pc_sequence = pc_sequence.as_univ(self.univ)
+        self._starts.append(self._size)
+        for interval in pc_sequence.intervals().intervals:
+            self._extend(interval)
+        self._extend(-1 - len(self.pc_sequences))
+        self.pc_sequences.append(pc_sequence)
+        self._children = None
+
+    def _new_state(self, length, link, transitions, end, clone):
+        self._lengths.append(length)
+        self._links.append(link)
+        self._transitions.append(transitions)
+        self._ends.append(end)
+        self._clones.append(clone)
+        return len(self._lengths) - 1
+
+    def _extend(self, symbol):
+        "add a symbol to the end of the text"
+        transitions = self._transitions
+        state = self._new_state(
+            self._lengths[self._last] + 1, -1, {}, self._size, False
+        )
+        previous = self._last
+        while previous != -1 and symbol not in transitions[previous]:
+            transitions[previous][symbol] = state
+            previous = self._links[previous]
+        if previous == -1:
+            self._links[state] = 0
+        else:
+            target = transitions[previous][symbol]
+            if self._lengths[previous] + 1 == self._lengths[target]:
+                self._links[state] = target
             else:
-                t = type(element)
-                message = "All elements of pc_sets must be of type PitchClassSet, list, tuple, set, or int; received {}".format(
-                    t
+                clone = self._new_state(
+                    self._lengths[previous] + 1,
+                    self._links[target],
+                    dict(transitions[target]),
+                    self._ends[target],
+                    True,
                 )
-                raise TypeError(message)
-        return sequence
+                while transitions[previous].get(symbol) == target:
+                    transitions[previous][symbol] = clone
+                    previous = self._links[previous]
+                    if previous == -1:
+                        break
+                self._links[target] = clone
+                self._links[state] = clone
+        self._last = state
+        self._size += 1
+
+    def _end_positions(self, intervals):
+        "return the positions in the text at which intervals end"
+        state = 0
+        for interval in intervals:
+            state = self._transitions[state].get(interval)
+            if state is None:
+                return []
+        if self._children is None:
+            self._children = [[] for link in self._links]
+            for child, link in enumerate(self._links):
+                if link != -1:
+                    self._children[link].append(child)
+        ends = []
+        stack = [state]
+        while stack:
+            state = stack.pop()
+            if not self._clones[state]:
+                ends.append(self._ends[state])
+            stack.extend(self._children[state])
+        return ends
+
+    def _variants(self, intervals, equivalence):
+        "return the distinct transformations of intervals under equivalence"
+        if "T" not in equivalence or set(equivalence) - set("TIRM"):
+            raise ValueError(
+                "equivalence must include T, and any of I, R and M; received {}".format(
+                    equivalence
+                )
+            )
+        multipliers = {1}
+        if "I" in equivalence:
+            multipliers.add(self.univ - 1)
+        if "M" in equivalence:
+            multipliers.update(m for m in range(self.univ) if gcd(m, self.univ) == 1)
+        variants = {tuple(m * i % self.univ for i in intervals) for m in multipliers}
+        if "R" in equivalence:
+            variants |= {
+                tuple(-i % self.univ for i in reversed(variant)) for variant in variants
+            }
+        return variants
+
+    def find(self, motif, equivalence="T"):
+        """return (sequence index, position) pairs for each occurrence of motif
+        in the indexed sequences up to equivalence: T, with any of I, R and M
+        (multiplication by any number coprime to the universe)"""
+        if not isinstance(motif, PitchClassSequence):
+            motif = PitchClassSequence(motif, univ=self.univ)
+        elif motif.univ != self.univ:
+            motif = motif.as_univ(self.univ)
+        if not len(motif):
+            raise ValueError("A motif must contain at least one pc")
+        intervals = motif.intervals().intervals
+        if not intervals:  # a single pc matches every pc up to transposition
+            return [
+                (sequence, position)
+                for sequence, pc_sequence in enumerate(self.pc_sequences)
+                for position in range(len(pc_sequence))
+            ]
+        found = set()
+        for variant in self._variants(intervals, equivalence):
+            for end in self._end_positions(variant):
+                start = end - len(variant) + 1
+                sequence = bisect_right(self._starts, start) - 1
+                found.add((sequence, start - self._starts[sequence]))
+        return sorted(found)
+
+
+_RECORD_TYPES = (
+    PitchClassSet,
+    FrozenPitchClassSet,
+    PitchClassSequence,
+    FrozenPitchClassSequence,
+    IntervalSequence,
+    SetSequence,
+)
+_SEQUENCE_RECORD_TYPES = _RECORD_TYPES[2:5]
+
+
+def dumps(pc_object):
+    """return a compact binary record of a PitchClassSet, PitchClassSequence,
+    IntervalSequence or SetSequence (frozen or not), which loads() reads back.
+    A record starts with its type and universe; sets follow as bitmasks, and
+    sequences as their length and then pcs of a fixed width for the universe.
+    Intervals are stored reduced mod univ."""
+    try:
+        tag = _RECORD_TYPES.index(type(pc_object))
+    except ValueError:
+        raise TypeError("cannot serialize {}".format(type(pc_object))) from None
+    univ = pc_object.univ
+    header = bytes([tag]) + _varint(univ)
+    if isinstance(pc_object, PitchClassSet):
+        return header + _packed_mask(pc_object._mask, univ)
+    if isinstance(pc_object, PitchClassSequence):
+        pcs = pc_object._values()
+    elif isinstance(pc_object, IntervalSequence):
+        pcs = [interval % univ for interval in pc_object.intervals]
+    else:
+        parts = [header, _varint(len(pc_object.pc_sets))]
+        for pc_set in pc_object.pc_sets:
+            parts.append(_varint(pc_set.univ))
+            parts.append(_packed_mask(pc_set._mask, pc_set.univ))
+        return b"".join(parts)
+    return header + _varint(len(pcs)) + _packed_pcs(pcs, univ)
+
+
+def loads(data):
+    "return the object in a record made by dumps()"
+    data = memoryview(data)
+    try:
+        pc_object, end = _decoded(data, 0)
+    except IndexError:
+        raise ValueError("truncated record") from None
+    if end != data.nbytes:
+        raise ValueError(
+            "{} bytes after the end of the record".format(data.nbytes - end)
+        )
+    return pc_object
+
+
+_CORPUS_MAGIC = b"PCCORPUS"
+_CORPUS_VERSION = 1
+_CORPUS_HEADER = struct.Struct("<8sIQQ")  # magic, version, records, table offset
+
+
+def write_corpus(path, pc_objects):
+    """write pc_objects to a corpus file at path, each as a record from
+    dumps(), followed by a table of the offsets of the records; return the
+    number of records"""
+    offsets = array("Q")
+    with open(path, "wb") as file:
+        file.write(bytes(_CORPUS_HEADER.size))
+        position = _CORPUS_HEADER.size
+        for pc_object in pc_objects:
+            record = dumps(pc_object)
+            offsets.append(position)
+            file.write(record)
+            position += len(record)
+        offsets.append(position)
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        file.write(offsets.tobytes())
+        count = len(offsets) - 1
+        file.seek(0)
+        file.write(_CORPUS_HEADER.pack(_CORPUS_MAGIC, _CORPUS_VERSION, count, position))
+    return count
+
+
+class Corpus:
+    """A corpus file written by write_corpus(), memory-mapped read-only so
+    that opening it reads nothing but the header. corpus[i] decodes record i;
+    record_view(i) gives its packed data without copying it. Views must be
+    released before the corpus is closed."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = memoryview(self._map)
+        if len(self._map) < _CORPUS_HEADER.size:
+            self.close()
+            raise ValueError("{} is not a corpus file".format(path))
+        magic, version, count, table = _CORPUS_HEADER.unpack_from(self._data)
+        if magic != _CORPUS_MAGIC:
+            self.close()
+            raise ValueError("{} is not a corpus file".format(path))
+        if version != _CORPUS_VERSION:
+            self.close()
+            raise ValueError("unsupported corpus version {}".format(version))
+        table_end = table + 8 * (count + 1)
+        if table < _CORPUS_HEADER.size or table_end > len(self._map):
+            self.close()
+            raise ValueError("{} is truncated".format(path))
+        self._offsets = _little_endian_view(self._data[table:table_end], "Q")
+
+    def __repr__(self):
+        return "Corpus {}[{} records]".format(self.path, len(self))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        index = range(len(self))[index]
+        return _decoded(self._data, self._offsets[index])[0]
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    def record_view(self, index):
+        """return the type and universe of record index, and a view of its
+        data in the file: the pcs or intervals of a sequence, as ints where
+        they have a fixed width for the universe, and otherwise the packed
+        bitmask of a set or the packed sets of a SetSequence"""
+        index = range(len(self))[index]
+        start, end = self._offsets[index], self._offsets[index + 1]
+        record_type = _RECORD_TYPES[self._data[start]]
+        univ, position = _read_varint(self._data, start + 1)
+        if record_type in _SEQUENCE_RECORD_TYPES or record_type is SetSequence:
+            position = _read_varint(self._data, position)[1]  # skip the length
+        data = self._data[position:end]
+        typecode = _pc_typecode(univ)
+        if record_type in _SEQUENCE_RECORD_TYPES and typecode is not None:
+            data = _little_endian_view(data, typecode)
+        return record_type, univ, data
+
+    def close(self):
+        for view in (getattr(self, "_offsets", None), self._data):
+            if isinstance(view, memoryview):
+                view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _varint(n):
+    "return n, a non-negative int, as a little-endian base 128 varint"
+    encoded = bytearray()
+    while n >= 0x80:
+        encoded.append(n & 0x7F | 0x80)
+        n >>= 7
+    encoded.append(n)
+    return bytes(encoded)
+
+
+def _read_varint(data, position):
+    "return the varint at position in data, and the position after it"
+    n = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, position
+        shift += 7
+
+
+def _packed_mask(mask, univ):
+    return mask.to_bytes((univ + 7) // 8, "little")
+
+
+def _unpacked_mask(data, position, univ):
+    "return the bitmask of univ packed at position in data, and the position after it"
+    end = position + (univ + 7) // 8
+    if end > len(data):
+        raise IndexError("truncated bitmask")
+    return int.from_bytes(data[position:end], "little"), end
+
+
+def _packed_pcs(pcs, univ):
+    """return pcs as little-endian ints of the width of _pc_typecode(univ), or
+    as varints if univ is too large for a typed array"""
+    typecode = _pc_typecode(univ)
+    if typecode is None:
+        return b"".join(map(_varint, pcs))
+    if not (isinstance(pcs, array) and pcs.typecode == typecode):
+        pcs = array(typecode, pcs)
+    if sys.byteorder == "big":
+        pcs = array(typecode, pcs)
+        pcs.byteswap()
+    return pcs.tobytes()
+
+
+def _unpacked_pcs(data, position, length, univ):
+    "return a buffer of the length pcs packed at position in data, and the position after them"
+    typecode = _pc_typecode(univ)
+    if typecode is None:
+        pcs = []
+        for i in range(length):
+            pc, position = _read_varint(data, position)
+            pcs.append(pc)
+        return pcs, position
+    pcs = array(typecode)
+    end = position + length * pcs.itemsize
+    pcs.frombytes(data[position:end])
+    if len(pcs) != length:
+        raise IndexError("truncated sequence")
+    if sys.byteorder == "big":
+        pcs.byteswap()
+    return pcs, end
+
+
+def _little_endian_view(data, typecode):
+    """return the little-endian ints in data as a sequence: a cast of the
+    memoryview, or on big-endian machines a byte-swapped copy"""
+    if sys.byteorder == "little":
+        return data.cast(typecode)
+    values = array(typecode, data.tobytes())
+    values.byteswap()
+    return values
+
+
+def _decoded(data, position):
+    "return the object in the record at position in data, and the position after it"
+    tag = data[position]
+    if tag >= len(_RECORD_TYPES):
+        raise ValueError("unknown record type {}".format(tag))
+    record_type = _RECORD_TYPES[tag]
+    univ, position = _read_varint(data, position + 1)
+    if issubclass(record_type, PitchClassSet):
+        mask, position = _unpacked_mask(data, position, univ)
+        return record_type._from_mask(mask, univ), position
+    length, position = _read_varint(data, position)
+    if record_type is SetSequence:
+        pc_sets = []
+        for i in range(length):
+            set_univ, position = _read_varint(data, position)
+            mask, position = _unpacked_mask(data, position, set_univ)
+            pc_sets.append(PitchClassSet._from_mask(mask, set_univ))
+        set_sequence = SetSequence.__new__(SetSequence)
+        set_sequence.univ = univ
+        set_sequence.pc_sets = pc_sets
+        return set_sequence, position
+    pcs, position = _unpacked_pcs(data, position, length, univ)
+    if record_type is PitchClassSequence:
+        return PitchClassSequence._from_data(pcs, univ), position
+    if record_type is IntervalSequence:
+        return (
+            IntervalSequence(pcs.tolist() if isinstance(pcs, array) else pcs, univ),
+            position,
+        )
+    return FrozenPitchClassSequence(pcs, univ), position
+
+
+def _parse_set(element, univ):
+    "return a new PitchClassSet from an element of a SetSequence"
+    if isinstance(element, PitchClassSet):
+        return element.copy()
+    elif (
+        isinstance(element, list)
+        or isinstance(element, tuple)
+        or isinstance(element, set)
+    ):
+        return PitchClassSet(element, univ=univ)
+    elif isinstance(element, int):
+        return PitchClassSet([element], univ=univ)
+    else:
+        t = type(element)
+        message = "All elements of pc_sets must be of type PitchClassSet, list, tuple, set, or int; received {}".format(
+            t
+        )
+        raise TypeError(message)
+
+
+def _read_sets(path):
+    "yield the pcs on each line of a file of sets, reading one line at a time"
+    with open(path) as lines:
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield [int(pc) for pc in line.replace(",", " ").split()]
+
+
+class _SetFile:
+    "the sets in a file of sets, read again from the start on each iteration"
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        return _read_sets(self.path)
+
+
+def _common_tones(pc_sets):
+    previous = None
+    for pc_set in pc_sets:
+        if previous is not None:
+            mask, previous_mask, _ = pc_set._masks_in_normalized_univ(previous)
+            yield (mask & previous_mask).bit_count()
+        previous = pc_set
+
+
+def _voice_leadings(pc_sets, norm):
+    previous = None
+    for pc_set in pc_sets:
+        if previous is not None:
+            yield previous.voice_leading(pc_set, norm)
+        previous = pc_set
+
+
+def _windowed(items, size, func):
+    window = deque(maxlen=size)
+    for item in items:
+        window.append(item)
+        if len(window) == size:
+            yield func(tuple(window))
+
+
+_NORMS = ("L1", "L2", "Linf")
+
+
+def _check_norm(norm):
+    if norm not in _NORMS:
+        raise ValueError("norm must be one of {}".format(", ".join(_NORMS)))
+
+
+_MEASURES = ("SIM", "IcVSIM", "ATMEMB", "REL", "Rp")
+
+
+def _check_measure(measure):
+    if measure not in _MEASURES:
+        raise ValueError("measure must be one of {}".format(", ".join(_MEASURES)))
+
+
+@lru_cache(maxsize=1 << 12)
+def _subset_classes(prime, univ):
+    """return a dictionary from the TnI prime form of each set class of the
+    subsets of prime with two or more pcs to the number of those subsets"""
+    counts = {}
+    subset = prime
+    while subset:
+        if subset.bit_count() >= 2:
+            subset_prime = _prime_mask(subset, univ, "TnI")
+            counts[subset_prime] = counts.get(subset_prime, 0) + 1
+        subset = (subset - 1) & prime
+    return counts
+
+
+@lru_cache(maxsize=1 << 16)
+def _class_similarity(prime, other_prime, univ, measure):
+    "return the similarity by measure of two TnI prime forms"
+    if measure == "SIM" or measure == "IcVSIM":
+        vector = _interval_counts(prime, univ)
+        other_vector = _interval_counts(other_prime, univ)
+        differences = [a - b for a, b in zip(vector, other_vector)]
+        if measure == "SIM":
+            return sum(map(abs, differences))
+        if not differences:
+            return 0.0
+        mean = sum(differences) / len(differences)
+        return sqrt(sum((d - mean) ** 2 for d in differences) / len(differences))
+    if measure == "Rp":
+        cardinality = prime.bit_count()
+        if other_prime.bit_count() != cardinality or cardinality == 0:
+            return 0.0
+        if cardinality <= 2:  # every set of fewer than two pcs is one class
+            return 1.0
+        subsets = _subset_classes(prime, univ).keys()
+        other_subsets = _subset_classes(other_prime, univ).keys()
+        shared = subsets & other_subsets
+        return float(any(s.bit_count() == cardinality - 1 for s in shared))
+    counts = _subset_classes(prime, univ)
+    other_counts = _subset_classes(other_prime, univ)
+    total, other_total = sum(counts.values()), sum(other_counts.values())
+    if not total or not other_total:
+        return float(prime == other_prime)
+    shared = counts.keys() & other_counts.keys()
+    if measure == "ATMEMB":
+        embedded = sum(counts[s] + other_counts[s] for s in shared)
+        return embedded / (total + other_total)
+    related = sum(sqrt(counts[s] * other_counts[s]) for s in shared)
+    return related / sqrt(total * other_total)
+
+
+@lru_cache(maxsize=1 << 16)
+def _voice_leading_cost(mask, other_mask, univ, norm):
+    """return the cost of the smallest voice leading between two non-empty
+    sets: the sum of the displacements of its voices (for "L1"), the sum of
+    their squares ("L2"), or the largest ("Linf"). Sets of equal cardinality
+    are matched one to one, by the best rotation of the second set's sorted
+    pcs against the first's, since some smallest voice leading has no voices
+    crossing; otherwise each pc may move to or from several, and crossing-free
+    alignments (dynamic time warping) are compared for each starting pc."""
+    if not mask or not other_mask:
+        raise ValueError("There is no voice leading to or from an empty set")
+    pcs = _mask_to_pcs(mask)
+    other_pcs = _mask_to_pcs(other_mask)
+    n, m = len(pcs), len(other_pcs)
+    weight = (lambda d: d * d) if norm == "L2" else abs
+    combine = max if norm == "Linf" else add
+    lifted = [pc + q * univ for q in (-1, 0, 1, 2) for pc in other_pcs]
+    best = None
+    if n == m:
+        for start in range(2 * n + 1):
+            targets = lifted[start : start + n]
+            cost = reduce(combine, map(weight, map(sub, targets, pcs)))
+            if best is None or cost < best:
+                best = cost
+        return best
+    for start in range(2 * m + 1):
+        window = lifted[start : start + m + 1]  # ends with the start, lifted
+        row = []
+        for pc in pcs:
+            previous_row, row = row, []
+            for j, target in enumerate(window):
+                cost = weight(target - pc)
+                if previous_row or j:
+                    steps = []
+                    if previous_row:
+                        steps.append(previous_row[j])
+                        if j:
+                            steps.append(previous_row[j - 1])
+                    if j:
+                        steps.append(row[j - 1])
+                    cost = combine(cost, min(steps))
+                row.append(cost)
+        cost = min(row[m - 1], row[m])
+        if best is None or cost < best:
+            best = cost
+    return best
+
+
+def _nearest_costs(pcs, other_pcs, univ, norm, combine):
+    """return the combined cost under norm of moving each of pcs to the
+    nearest of other_pcs, both sorted"""
+    total = 0
+    for pc in pcs:
+        i = bisect_left(other_pcs, pc)
+        above = other_pcs[i] - pc if i < len(other_pcs) else other_pcs[0] + univ - pc
+        below = pc - other_pcs[i - 1] if i else pc + univ - other_pcs[-1]
+        distance = min(above, below)
+        total = combine(total, distance * distance if norm == "L2" else distance)
+    return total
+
+
+def _voice_leading_distance(cost, norm, univ, new_univ):
+    "return a voice leading cost in univ as a distance in steps of new_univ"
+    distance = sqrt(cost) if norm == "L2" else cost
+    if new_univ != univ:
+        distance = distance * new_univ / univ
+    return distance
+
+
+def _pcs_to_mask(pcs, univ):
+    "return the bitmask with a bit set for each pitch class in pcs"
+    mask = 0
+    for pc in pcs:
+        mask |= 1 << (pc % univ)
+    return mask
+
+
+def _compared_masks(mask, other_mask):
+    """return a negative number, zero or a positive number as the sorted pcs
+    of mask are less than, equal to or greater than those of other_mask, in
+    the order of lists: the lowest pc in only one of them decides, unless the
+    other has no pcs above it"""
+    difference = mask ^ other_mask
+    if not difference:
+        return 0
+    lowest = difference & -difference
+    above = ~(lowest - 1)  # the lowest pc in only one of them, and every pc above
+    if mask & lowest:
+        return -1 if other_mask & above else 1
+    return 1 if mask & above else -1
+
+
+def _mask_to_pcs(mask):
+    "return the sorted list of pitch classes whose bits are set in mask"
+    pcs = []
+    while mask:
+        low_bit = mask & -mask
+        pcs.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return pcs
+
+
+_NONZERO_BYTE = re.compile(b"[^\x00]")
+
+
+def _bit_positions(bits):
+    """return the positions of the set bits of bits, which may be very large,
+    skipping runs of clear bits a byte at a time"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    positions = []
+    for match in _NONZERO_BYTE.finditer(data):
+        start = match.start()
+        byte = data[start]
+        while byte:
+            low_bit = byte & -byte
+            positions.append(8 * start + low_bit.bit_length() - 1)
+            byte ^= low_bit
+    return positions
+
+
+def _rotated(mask, transposition, univ):
+    "return mask with every pitch class transposed by transposition"
+    transposition %= univ
+    full = (1 << univ) - 1
+    return ((mask << transposition) | (mask >> (univ - transposition))) & full
+
+
+def _reflected(mask, univ):
+    "return mask with every pitch class pc replaced by -pc"
+    reversed_mask = int(format(mask, "0{}b".format(univ))[::-1], 2)  # pc -> univ-1-pc
+    return _rotated(reversed_mask, 1, univ)
+
+
+@lru_cache(maxsize=256)
+def _mask_map_tables(images):
+    """return lookup tables that map each byte of a bitmask to the bitmask of
+    the images of its pitch classes, where images[pc] is the new pc or None"""
+    tables = []
+    for start in range(0, len(images), 8):
+        table = [0] * 256
+        for byte in range(1, 256):
+            low_bit = byte & -byte
+            pc = start + low_bit.bit_length() - 1
+            image = images[pc] if pc < len(images) else None
+            table[byte] = table[byte ^ low_bit] | (0 if image is None else 1 << image)
+        tables.append(table)
+    return tables
+
+
+def _mapped_mask(mask, tables):
+    "return mask with each pitch class replaced by its image in tables"
+    mapped = 0
+    for table in tables:
+        mapped |= table[mask & 255]
+        mask >>= 8
+    return mapped
+
+
+@lru_cache(maxsize=256)
+def _univ_images(univ, new_univ, mode="e"):
+    """return a tuple giving the pitch class in new_univ of each pitch class
+    in univ when rescaled with mode, or None where there is none. Pitch
+    classes are scaled with exact integer arithmetic."""
+    if mode not in _AS_UNIV_MODES:
+        raise ValueError("invalid mode")
+    images = []
+    for pc in range(univ):
+        scaled, remainder = divmod(pc * new_univ, univ)
+        if remainder == 0:
+            images.append(scaled % new_univ)
+        elif mode in ("e", "exception", "d", "drop"):
+            images.append(None)
+        elif mode in ("c", "ceil", "ceiling"):
+            images.append((scaled + 1) % new_univ)
+        elif mode in ("r", "round"):
+            # round half to even, as round() does
+            if 2 * remainder > univ or (2 * remainder == univ and scaled % 2):
+                scaled += 1
+            images.append(scaled % new_univ)
+        else:
+            images.append(scaled)
+    return tuple(images)
+
+
+_AS_UNIV_MODES = (
+    "e",
+    "exception",
+    "d",
+    "drop",
+    "c",
+    "ceil",
+    "ceiling",
+    "r",
+    "round",
+    "f",
+    "floor",
+)
+
+
+@lru_cache(maxsize=256)
+def _inexact_mask(univ, new_univ):
+    "return the bitmask of the pitch classes in univ that do not exist in new_univ"
+    return _pcs_to_mask((pc for pc in range(univ) if pc * new_univ % univ), univ)
+
+
+def _check_exact_rescaling(mask, univ, new_univ):
+    inexact = mask & _inexact_mask(univ, new_univ)
+    if inexact:
+        err = (inexact & -inexact).bit_length() - 1
+        raise ValueError(
+            "pitch class {} does not exist in a universe of size {}.".format(
+                err, new_univ
+            )
+        )
+
+
+def _rescaled_mask(mask, univ, new_univ, mode="e"):
+    "return mask rescaled from univ to new_univ with mode, as in _as_univ"
+    if mode == "e" or mode == "exception":
+        _check_exact_rescaling(mask, univ, new_univ)
+    return _mapped_mask(mask, _mask_map_tables(_univ_images(univ, new_univ, mode)))
+
+
+def _spread_mask(mask, univ, factor):
+    "return mask with each pitch class pc moved to pc * factor"
+    if factor == 1:
+        return mask
+    digits = format(mask, "0{}b".format(univ))[::-1].encode("ascii")  # digits[pc]
+    spread = bytearray(b"0") * (univ * factor)
+    spread[::factor] = digits
+    return int(spread[::-1], 2)
+
+
+def _interval_counts(mask, univ):
+    """return the interval vector of mask, by comparing each pair of pitch
+    classes for small sets, or from the autocorrelation of large sets"""
+    cardinality = mask.bit_count()
+    if cardinality * cardinality > 2 * univ:
+        return _autocorrelated_interval_counts(mask, univ, cardinality)
+    counts = [0] * (univ // 2)
+    pcs = _mask_to_pcs(mask)
+    for i, low in enumerate(pcs):
+        for high in pcs[i + 1 :]:
+            interval = high - low
+            counts[min(interval, univ - interval) - 1] += 1
+    return counts
+
+
+_BIT_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _autocorrelated_interval_counts(mask, univ, cardinality):
+    """return the interval vector of mask from the cyclic autocorrelation of
+    its indicator vector, computed as a single product of big integers whose
+    digits (of width bytes) are the indicator vector and its reverse"""
+    if cardinality < 1 << 8:
+        width, typecode = 1, "B"
+    elif cardinality < 1 << 16:
+        width, typecode = 2, "H"
+    else:
+        width, typecode = 4, "I"
+    # bits[i] is 1 if pitch class univ - 1 - i is in the set
+    bits = format(mask, "0{}b".format(univ)).encode("ascii").translate(_BIT_DIGITS)
+    forward = bytearray(univ * width)
+    forward[::width] = bits[::-1]
+    backward = bytearray(univ * width)
+    backward[::width] = bits
+    product = int.from_bytes(forward, "little") * int.from_bytes(backward, "little")
+    coefficients = array(typecode, product.to_bytes(2 * univ * width, "little"))
+    if sys.byteorder == "big":
+        coefficients.byteswap()
+    # coefficients[univ - 1 + n] counts the pairs of pcs a, b with a - b == n
+    counts = [
+        coefficients[univ - 1 - interval] + coefficients[2 * univ - 1 - interval]
+        for interval in range(1, univ // 2 + 1)
+    ]
+    if univ % 2 == 0:
+        counts[-1] //= 2  # the half-octave interval is counted from both ends
+    return counts
+
+
+def _minimized_mask(mask, univ):
+    "return the smallest universe in which mask exists, and mask in that universe"
+    pcs = _mask_to_pcs(mask)
+    divisor = gcd(univ, *pcs)
+    return univ // divisor, _pcs_to_mask((pc // divisor for pc in pcs), univ // divisor)
+
+
+def _minimized_pcs(pcs, univ):
+    "return the smallest universe in which pcs exist, and pcs in that universe"
+    divisor = gcd(univ, *pcs)
+    return univ // divisor, tuple(pc // divisor for pc in pcs)
+
+
+def _normal_start(mask, univ):
+    "return the lowest pc t for which mask transposed by -t is its Tn prime form"
+    prime = _prime_mask(mask, univ, "Tn")
+    for start in _mask_to_pcs(mask):
+        if _rotated(mask, -start, univ) == prime:
+            return start
+    return 0
+
+
+def _transposition_period(mask, univ):
+    "return the smallest transposition that maps mask onto itself"
+    for period in range(1, univ + 1):
+        if univ % period == 0 and _rotated(mask, period, univ) == mask:
+            return period
+
+
+def _symmetry_multipliers(univ, multiplication):
+    "return 1 and -1 mod univ, followed by the other units of univ if multiplication"
+    multipliers = [1] if univ <= 2 else [1, univ - 1]
+    if multiplication:
+        multipliers += [m for m in range(2, univ - 1) if gcd(m, univ) == 1]
+    return multipliers
+
+
+def _multiplied_mask(mask, multiplier, univ):
+    "return mask with each pc multiplied by multiplier"
+    multiplier %= univ
+    if multiplier == 1:
+        return mask
+    if multiplier == univ - 1:
+        return _reflected(mask, univ)
+    images = tuple((pc * multiplier) % univ for pc in range(univ))
+    return _mapped_mask(mask, _mask_map_tables(images))
+
+
+def _transformations_onto(mask, other_mask, univ, multiplication):
+    """return the (multiplier, transposition) pairs of the operations
+    pc -> multiplier * pc + transposition that map mask onto other_mask, found
+    by comparing the Tn prime forms and normal starts of the multiples of mask
+    with those of other_mask"""
+    if mask.bit_count() != other_mask.bit_count():
+        return []
+    prime = _prime_mask(other_mask, univ, "Tn")
+    start = _normal_start(other_mask, univ)
+    period = _transposition_period(other_mask, univ)
+    transformations = []
+    for multiplier in _symmetry_multipliers(univ, multiplication):
+        image = _multiplied_mask(mask, multiplier, univ)
+        if _prime_mask(image, univ, "Tn") != prime:
+            continue
+        first = (start - _normal_start(image, univ)) % period
+        transformations += [(multiplier, t) for t in range(first, univ, period)]
+    return transformations
+
+
+def _transformations_into(mask, other_mask, univ, multiplication):
+    """return the (multiplier, transposition) pairs of the operations that map
+    mask onto a subset of other_mask, trying only the transpositions that
+    carry the lowest pc of each multiple of mask onto a member of other_mask"""
+    if mask.bit_count() > other_mask.bit_count():
+        return []
+    multipliers = _symmetry_multipliers(univ, multiplication)
+    if not mask:
+        return [(m, t) for m in multipliers for t in range(univ)]
+    transformations = []
+    for multiplier in multipliers:
+        image = _multiplied_mask(mask, multiplier, univ)
+        lowest = (image & -image).bit_length() - 1
+        for pc in _mask_to_pcs(other_mask):
+            transposition = (pc - lowest) % univ
+            if _rotated(image, transposition, univ) & ~other_mask == 0:
+                transformations.append((multiplier, transposition))
+    return transformations
+
+
+@lru_cache(maxsize=1 << 16)
+def _prime_pair_transformations(prime, other_prime, univ, multiplication, inclusion):
+    """return the (multiplier, transposition) pairs of the operations that map
+    prime onto (or if inclusion, into) other_prime, both Tn prime forms"""
+    if inclusion:
+        pairs = _transformations_into(prime, other_prime, univ, multiplication)
+    else:
+        pairs = _transformations_onto(prime, other_prime, univ, multiplication)
+    return tuple(pairs)
+
+
+@lru_cache(maxsize=1 << 16)
+def _tn_canonical(mask, univ):
+    "return the Tn prime form of mask and the transposition taking it to mask"
+    return _prime_mask(mask, univ, "Tn"), _normal_start(mask, univ)
+
+
+def _pair_transformations(mask, other_mask, univ, multiplication, inclusion):
+    """return the sorted (multiplier, transposition) pairs of the operations
+    that map mask onto (or into) other_mask: those between their Tn prime
+    forms, conjugated by the transpositions taking the prime forms to them"""
+    prime, start = _tn_canonical(mask, univ)
+    other_prime, other_start = _tn_canonical(other_mask, univ)
+    found = _prime_pair_transformations(
+        prime, other_prime, univ, multiplication, inclusion
+    )
+    if not found:
+        return []
+    pairs = [
+        (multiplier, (transposition + other_start - multiplier * start) % univ)
+        for multiplier, transposition in found
+    ]
+    return sorted(pairs, key=lambda pair: (pair[0] != 1, pair[0] != univ - 1, pair))
+
+
+def similarity_matrix(
+    pc_sets, others=None, measure="SIM", path=None, tile_size=1024, processes=1
+):
+    """return the similarity by measure (see PitchClassSet.similarity) of each
+    of pc_sets to each of others (by default, pc_sets again), both
+    PitchClassSetArrays or lists of PitchClassSets in one universe, as a
+    memoryview of float32 values with one row for each of pc_sets, indexed as
+    matrix[i, j]. The matrix is computed in square tiles, in a pool of that
+    many processes if processes > 1. With path, it is written to a file there
+    (in the machine's byte order) and the view maps that file, so the matrix
+    need not fit in memory."""
+    _check_measure(measure)
+    if not isinstance(pc_sets, PitchClassSetArray):
+        pc_sets = PitchClassSetArray.from_sets(list(pc_sets))
+    if others is None:
+        others = pc_sets
+    elif not isinstance(others, PitchClassSetArray):
+        others = PitchClassSetArray.from_sets(list(others))
+    if not len(pc_sets) or not len(others):
+        raise ValueError("similarity_matrix needs at least one set on each side")
+    univ = lcm(pc_sets.univ, others.univ)
+    primes = [_prime_mask(mask, univ, "TnI") for mask in pc_sets.as_univ(univ).masks]
+    other_primes = [
+        _prime_mask(mask, univ, "TnI") for mask in others.as_univ(univ).masks
+    ]
+    size = 4 * len(primes) * len(other_primes)
+    if path is None:
+        buffer = bytearray(size)
+    else:
+        with open(path, "w+b") as file:
+            file.truncate(size)
+            buffer = mmap.mmap(file.fileno(), size)
+    matrix = memoryview(buffer).cast("f")
+    tiles = [
+        (start, other_start)
+        for start in range(0, len(primes), tile_size)
+        for other_start in range(0, len(other_primes), tile_size)
+    ]
+    arguments = (
+        [primes[start : start + tile_size] for start, _ in tiles],
+        [
+            other_primes[other_start : other_start + tile_size]
+            for _, other_start in tiles
+        ],
+        [univ] * len(tiles),
+        [measure] * len(tiles),
+    )
+    if processes == 1:
+        found = map(_similarity_tile, *arguments)
+    else:
+        executor = ProcessPoolExecutor(processes)
+        found = executor.map(_similarity_tile, *arguments)
+    try:
+        width = len(other_primes)
+        for (start, other_start), tile in zip(tiles, found):
+            tile_width = min(tile_size, width - other_start)
+            for i in range(len(tile) // tile_width):
+                offset = (start + i) * width + other_start
+                row = tile[i * tile_width : (i + 1) * tile_width]
+                matrix[offset : offset + tile_width] = memoryview(row)
+    finally:
+        if processes != 1:
+            executor.shutdown(cancel_futures=True)
+    matrix.release()
+    if path is not None:
+        buffer.flush()
+    return memoryview(buffer).cast("f", (len(primes), len(other_primes)))
+
+
+def _similarity_tile(primes, other_primes, univ, measure):
+    """return the similarities of primes to other_primes as a flat array of
+    float32 rows, computing each row once for each distinct prime"""
+    tile = array("f")
+    rows = {}
+    for prime in primes:
+        row = rows.get(prime)
+        if row is None:
+            values = {
+                other_prime: _class_similarity(prime, other_prime, univ, measure)
+                for other_prime in set(other_primes)
+            }
+            row = rows[prime] = array("f", map(values.__getitem__, other_primes))
+        tile.extend(row)
+    return tile
+
+
+def _transformations_between(pc_set, other_set, multiplication, inclusion):
+    mask, other_mask, univ = pc_set._masks_in_normalized_univ(other_set)
+    pairs = _pair_transformations(mask, other_mask, univ, multiplication, inclusion)
+    return [Transformation(m, t, univ) for m, t in pairs]
+
+
+def transformations_between(pairs, multiplication=False, inclusion=False):
+    """return, for each pair (A, B) of PitchClassSets in pairs, the
+    Transformations that map A onto B, or if inclusion, into B. Pairs are
+    solved through their Tn prime forms, so pairs of the same set classes
+    share the work."""
+    return [
+        _transformations_between(pc_set, other_set, multiplication, inclusion)
+        for pc_set, other_set in pairs
+    ]
+
+
+def _check_equivalence(equivalence):
+    if equivalence not in ("Tn", "TnI"):
+        raise ValueError("equivalence must be 'Tn' or 'TnI'")
+
+
+@lru_cache(maxsize=None)
+def _prime_table(univ, inversion):
+    """return a table mapping every bitmask in a universe to its prime form
+    bitmask, from the table cache if it has one, and otherwise built (and
+    added to the cache, if there is one)"""
+    table = _cached_prime_table(univ, inversion)
+    if table is None:
+        table = _built_prime_table(univ, inversion)
+        if _table_cache_directory is not None:
+            try:
+                _write_prime_table(table, univ, inversion, _table_cache_directory)
+            except OSError:
+                pass  # a cache that cannot be written is only slower
+    return table
+
+
+def _built_prime_table(univ, inversion):
+    "return array mapping every bitmask in a universe to its prime form bitmask"
+    table = array("I", [0]) * (1 << univ)
+    for mask in range(1, 1 << univ):
+        if table[mask]:
+            continue
+        orbit = [_rotated(mask, t, univ) for t in range(univ)]
+        if inversion:
+            reflected = _reflected(mask, univ)
+            orbit += [_rotated(reflected, t, univ) for t in range(univ)]
+        prime = min(orbit)
+        for image in orbit:
+            table[image] = prime
+    return table
+
+
+@lru_cache(maxsize=1 << 16)
+def _searched_prime_mask(mask, univ, inversion):
+    "return the prime form bitmask of mask, trying each rotation onto a member"
+    candidates = [mask, _reflected(mask, univ)] if inversion else [mask]
+    prime = mask
+    for candidate in candidates:
+        for pc in _mask_to_pcs(candidate):
+            prime = min(prime, _rotated(candidate, -pc, univ))
+    return prime
+
+
+def _prime_mask(mask, univ, equivalence="TnI"):
+    """return the bitmask of the prime form of mask under equivalence, which
+    is the smallest bitmask among its transpositions (and inversions)"""
+    _check_equivalence(equivalence)
+    inversion = equivalence == "TnI"
+    if univ <= TABLE_UNIV_LIMIT:
+        return _prime_table(univ, inversion)[mask]
+    if _table_cache_directory is not None and univ <= _TABLE_CACHE_UNIV_LIMIT:
+        table = _cached_prime_table(univ, inversion)
+        if table is not None:
+            return table[mask]
+    return _searched_prime_mask(mask, univ, inversion)
+
+
+_table_cache_directory = os.environ.get("PITCHCLASSES_TABLE_CACHE") or None
+# a table of 2 ** 24 entries takes 64 MiB and about 20 seconds to build;
+# larger universes are catalogued by cardinality instead
+_TABLE_CACHE_UNIV_LIMIT = 24
+_TABLE_MAGIC = b"PCTABLE\0"
+_TABLE_VERSION = 1
+_TABLE_HEADER = struct.Struct("<8sIIII")  # magic, version, univ, inversion, crc32
+_CATALOG_MAGIC = b"PCCLASS\0"
+# magic, version, univ, cardinality, inversion, number of classes, crc32
+_CATALOG_HEADER = struct.Struct("<8sIIIIQI")
+
+
+def set_table_cache(directory):
+    """keep prime form tables in files in directory (or stop, if it is None),
+    from where every process memory-maps each universe's tables the first
+    time it needs them rather than building its own. The environment
+    variable PITCHCLASSES_TABLE_CACHE sets the directory at import."""
+    global _table_cache_directory
+    _table_cache_directory = directory
+    _prime_table.cache_clear()
+    _cached_prime_table.cache_clear()
+    _cached_catalog.cache_clear()
+
+
+def build_table_cache(univs, directory=None, cardinalities=None):
+    """build the Tn and TnI prime form tables of each universe in univs into
+    directory (by default, the table cache), so that prime forms in
+    universes larger than TABLE_UNIV_LIMIT are looked up rather than searched
+    for; return the paths of the files written. A table holds 2 ** univ
+    entries, so tables are limited to universes of up to 24. Given
+    cardinalities, build instead the catalog of the set classes of each of
+    those cardinalities in each universe, under Tn and under TnI: their prime
+    forms and interval vectors, which set_classes and set_class_catalog then
+    read rather than enumerate. Catalogs can be built for any universe."""
+    directory = directory or _table_cache_directory
+    if directory is None:
+        raise ValueError("no table cache directory is set")
+    paths = []
+    for univ in univs:
+        if cardinalities is not None:
+            for cardinality in cardinalities:
+                for inversion in (False, True):
+                    masks = _enumerated_primes(univ, cardinality, inversion)
+                    paths.append(
+                        _write_catalog(masks, univ, cardinality, inversion, directory)
+                    )
+            continue
+        if univ > _TABLE_CACHE_UNIV_LIMIT:
+            raise ValueError(
+                "prime form tables are limited to universes of up to {}; "
+                "give cardinalities to catalog larger ones".format(
+                    _TABLE_CACHE_UNIV_LIMIT
+                )
+            )
+        for inversion in (False, True):
+            table = _built_prime_table(univ, inversion)
+            paths.append(_write_prime_table(table, univ, inversion, directory))
+    _prime_table.cache_clear()
+    _cached_prime_table.cache_clear()
+    _cached_catalog.cache_clear()
+    return paths
+
+
+def _prime_table_path(univ, inversion, directory):
+    name = "prime-{}-{}.v{}.table".format(
+        univ, "TnI" if inversion else "Tn", _TABLE_VERSION
+    )
+    return os.path.join(directory, name)
+
+
+def _write_prime_table(table, univ, inversion, directory):
+    """write table to the table cache in directory through a temporary file,
+    so that other processes never see part of it; return its path"""
+    if sys.byteorder == "big":
+        table = array("I", table)
+        table.byteswap()
+    header = _TABLE_HEADER.pack(
+        _TABLE_MAGIC, _TABLE_VERSION, univ, inversion, zlib.crc32(table)
+    )
+    os.makedirs(directory, exist_ok=True)
+    path = _prime_table_path(univ, inversion, directory)
+    temporary = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(table)
+    os.replace(temporary, path)
+    return path
+
+
+@lru_cache(maxsize=None)
+def _cached_prime_table(univ, inversion):
+    """return the prime form table of univ memory-mapped from the table
+    cache, or None if the cache has no copy whose header and checksum are
+    valid"""
+    if _table_cache_directory is None:
+        return None
+    path = _prime_table_path(univ, inversion, _table_cache_directory)
+    try:
+        with open(path, "rb") as file:
+            data = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError):  # missing or empty
+        return None
+    table = data[_TABLE_HEADER.size :]
+    if len(table) != 4 << univ:
+        return None
+    header = (_TABLE_MAGIC, _TABLE_VERSION, univ, inversion, zlib.crc32(table))
+    if _TABLE_HEADER.unpack_from(data) != header:
+        return None
+    return _little_endian_view(table, "I")
+
+
+def _catalog_path(univ, cardinality, inversion, directory):
+    name = "classes-{}-{}-{}.v{}.table".format(
+        univ, cardinality, "TnI" if inversion else "Tn", _TABLE_VERSION
+    )
+    return os.path.join(directory, name)
+
+
+def _write_catalog(masks, univ, cardinality, inversion, directory):
+    """write the catalog of the set classes whose prime forms are masks to
+    the table cache in directory, as for _write_prime_table: the prime forms
+    packed into univ bits each, then their interval vectors; return its path"""
+    width = (univ + 7) // 8
+    masks = list(masks)
+    vectors = array(_pc_typecode(univ + 1))
+    for mask in masks:
+        vectors.extend(_interval_counts(mask, univ))
+    if sys.byteorder == "big":
+        vectors.byteswap()
+    body = b"".join(mask.to_bytes(width, "little") for mask in masks)
+    body += vectors.tobytes()
+    header = _CATALOG_HEADER.pack(
+        _CATALOG_MAGIC,
+        _TABLE_VERSION,
+        univ,
+        cardinality,
+        inversion,
+        len(masks),
+        zlib.crc32(body),
+    )
+    os.makedirs(directory, exist_ok=True)
+    path = _catalog_path(univ, cardinality, inversion, directory)
+    temporary = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(body)
+    os.replace(temporary, path)
+    return path
+
+
+@lru_cache(maxsize=None)
+def _cached_catalog(univ, cardinality, inversion):
+    """return the prime form bitmasks and the interval vectors (a flat
+    sequence, univ // 2 counts to a class) of the set classes of cardinality
+    in univ, from the table cache, or None if the cache has no copy whose
+    header and checksum are valid"""
+    if _table_cache_directory is None:
+        return None
+    path = _catalog_path(univ, cardinality, inversion, _table_cache_directory)
+    try:
+        with open(path, "rb") as file:
+            data = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError):  # missing or empty
+        return None
+    if len(data) < _CATALOG_HEADER.size:
+        return None
+    count = _CATALOG_HEADER.unpack_from(data)[5]
+    width = (univ + 7) // 8
+    typecode = _pc_typecode(univ + 1)
+    size = count * (width + (univ // 2) * array(typecode).itemsize)
+    body = data[_CATALOG_HEADER.size :]
+    if len(body) != size:
+        return None
+    header = (
+        _CATALOG_MAGIC,
+        _TABLE_VERSION,
+        univ,
+        cardinality,
+        inversion,
+        count,
+        zlib.crc32(body),
+    )
+    if _CATALOG_HEADER.unpack_from(data) != header:
+        return None
+    masks = [
+        int.from_bytes(body[i : i + width], "little")
+        for i in range(0, count * width, width)
+    ]
+    return masks, _little_endian_view(body[count * width :], typecode)
+
+
+# prime forms of the 12-tone set classes of cardinality 3 to 6, with pcs 10
+# and 11 written as A and B; the remaining classes are named by complement
+_FORTE_PRIME_FORMS = """
+3-1 012 3-2 013 3-3 014 3-4 015 3-5 016 3-6 024 3-7 025 3-8 026 3-9 027
+3-10 036 3-11 037 3-12 048
+4-1 0123 4-2 0124 4-3 0134 4-4 0125 4-5 0126 4-6 0127 4-7 0145 4-8 0156
+4-9 0167 4-10 0235 4-11 0135 4-12 0236 4-13 0136 4-14 0237 4-Z15 0146
+4-16 0157 4-17 0347 4-18 0147 4-19 0148 4-20 0158 4-21 0246 4-22 0247
+4-23 0257 4-24 0248 4-25 0268 4-26 0358 4-27 0258 4-28 0369 4-Z29 0137
+5-1 01234 5-2 01235 5-3 01245 5-4 01236 5-5 01237 5-6 01256 5-7 01267
+5-8 02346 5-9 01246 5-10 01346 5-11 02347 5-Z12 01356 5-13 01248 5-14 01257
+5-15 01268 5-16 01347 5-Z17 01348 5-Z18 01457 5-19 01367 5-20 01568
+5-21 01458 5-22 01478 5-23 02357 5-24 01357 5-25 02358 5-26 02458
+5-27 01358 5-28 02368 5-29 01368 5-30 01468 5-31 01369 5-32 01469
+5-33 02468 5-34 02469 5-35 02479 5-Z36 01247 5-Z37 03458 5-Z38 01258
+6-1 012345 6-2 012346 6-Z3 012356 6-Z4 012456 6-5 012367 6-Z6 012567
+6-7 012678 6-8 023457 6-9 012357 6-Z10 013457 6-Z11 012457 6-Z12 012467
+6-Z13 013467 6-14 013458 6-15 012458 6-16 014568 6-Z17 012478 6-18 012578
+6-Z19 013478 6-20 014589 6-21 023468 6-22 012468 6-Z23 023568 6-Z24 013468
+6-Z25 013568 6-Z26 013578 6-27 013469 6-Z28 013569 6-Z29 013689
+6-30 013679 6-31 014579 6-32 024579 6-33 023579 6-34 013579 6-35 02468A
+6-Z36 012347 6-Z37 012348 6-Z38 012378 6-Z39 023458 6-Z40 012358
+6-Z41 012368 6-Z42 012369 6-Z43 012568 6-Z44 012569 6-Z45 023469
+6-Z46 012469 6-Z47 012479 6-Z48 012579 6-Z49 013479 6-Z50 014679
+"""
+
+
+@lru_cache(maxsize=None)
+def _forte_names():
+    "return dict mapping the prime form bitmask of each 12-tone set class to its name"
+    full = (1 << 12) - 1
+    names = {}
+    entries = [("0-1", 0), ("1-1", 1)]
+    entries += [("2-{}".format(ic), 1 | 1 << ic) for ic in range(1, 7)]
+    tokens = _FORTE_PRIME_FORMS.split()
+    for name, pcs in zip(tokens[::2], tokens[1::2]):
+        entries.append((name, _pcs_to_mask((int(pc, 16) for pc in pcs), 12)))
+    for name, mask in entries:
+        cardinality, number = name.split("-")
+        names[_prime_mask(mask, 12)] = name
+        if cardinality != "6":
+            complement_name = "{}-{}".format(12 - int(cardinality), number)
+            names[_prime_mask(full & ~mask, 12)] = complement_name
+    return names
 
 
 def aggregate(univ=PC_UNIVERSE):
@@ -410,3 +3043,434 @@ def maximally_distributed(i, univ=PC_UNIVERSE):
     pc_set = aggregate(i)
     pc_set.set_univ(univ, "floor")
     return pc_set
+
+
+def set_classes(univ=PC_UNIVERSE, cardinality=None, equivalence="TnI"):
+    """yield the prime form of each set class of the given cardinality (or of
+    every cardinality, smallest first) in a universe of size univ"""
+    _check_equivalence(equivalence)
+    if cardinality is None:
+        cardinalities = range(univ + 1)
+    else:
+        cardinalities = [cardinality]
+    for k in cardinalities:
+        catalog = _cached_catalog(univ, k, equivalence == "TnI")
+        if catalog is not None:
+            masks = catalog[0]
+        else:
+            masks = _enumerated_primes(univ, k, equivalence == "TnI")
+        for prime in masks:
+            yield PitchClassSet._from_mask(prime, univ)
+
+
+def set_class_catalog(univ, cardinality, equivalence="TnI"):
+    """return a list of (prime form, IntervalVector) pairs for the set classes
+    of the given cardinality in a universe of size univ, read from the table
+    cache if build_table_cache has catalogued them"""
+    _check_equivalence(equivalence)
+    catalog = _cached_catalog(univ, cardinality, equivalence == "TnI")
+    if catalog is None:
+        return [
+            (pc_set, pc_set.vector())
+            for pc_set in set_classes(univ, cardinality, equivalence)
+        ]
+    masks, vectors = catalog
+    size = univ // 2
+    return [
+        (
+            PitchClassSet._from_mask(mask, univ),
+            IntervalVector(list(vectors[i * size : (i + 1) * size]), univ=univ),
+        )
+        for i, mask in enumerate(masks)
+    ]
+
+
+def _enumerated_primes(univ, cardinality, inversion):
+    """yield the prime form bitmask of each set class of cardinality in univ,
+    under TnI if inversion and otherwise Tn"""
+    for gaps in _necklace_gaps(univ, cardinality):
+        mask, pc = 0, 0
+        for gap in gaps:
+            mask |= 1 << pc
+            pc += gap
+        prime = _prime_mask(mask, univ, "Tn")
+        if inversion and prime != _prime_mask(mask, univ, "TnI"):
+            continue  # the inversion of this Tn-type is yielded instead
+        yield prime
+
+
+def _necklace_gaps(univ, cardinality):
+    """yield one gap sequence (the intervals between successive members of a
+    set) for each Tn-type of the given cardinality, using the FKM necklace
+    algorithm restricted to gap sequences that sum to univ"""
+    if cardinality == 0:
+        yield []
+        return
+    gaps = [1] * (cardinality + 1)  # 1-indexed; gaps[0] is the smallest gap
+
+    def extend(t, p, remaining):
+        if t == cardinality:
+            if remaining >= gaps[t - p]:
+                gaps[t] = remaining
+                period = p if remaining == gaps[t - p] else t
+                if cardinality % period == 0:
+                    yield gaps[1:]
+            return
+        for gap in range(gaps[t - p], remaining - (cardinality - t) + 1):
+            gaps[t] = gap
+            yield from extend(t + 1, p if gap == gaps[t - p] else t, remaining - gap)
+
+    yield from extend(1, 1, univ)
+
+
+def set_class_count(univ=PC_UNIVERSE, cardinality=None, equivalence="TnI"):
+    """return the number of set classes of the given cardinality (or of every
+    cardinality) in a universe of size univ, counted with Burnside's lemma"""
+    _check_equivalence(equivalence)
+    if cardinality is None:
+        return sum(set_class_count(univ, k, equivalence) for k in range(univ + 1))
+    if not 0 <= cardinality <= univ:
+        return 0
+    # sets fixed by each transposition
+    common = gcd(univ, cardinality)
+    fixed = sum(
+        _totient(d) * comb(univ // d, cardinality // d)
+        for d in range(1, common + 1)
+        if common % d == 0
+    )
+    necklaces = fixed // univ
+    if equivalence == "Tn":
+        return necklaces
+    # sets fixed by each inversion
+    half, odd = divmod(cardinality, 2)
+    if univ % 2:
+        return (necklaces + comb(univ // 2, half)) // 2
+    pairs = univ // 2
+    if odd:
+        axis_through_pcs = 2 * comb(pairs - 1, half)
+        axis_between_pcs = 0
+    else:
+        axis_through_pcs = comb(pairs - 1, half)
+        if half:
+            axis_through_pcs += comb(pairs - 1, half - 1)
+        axis_between_pcs = comb(pairs, half)
+    return (2 * necklaces + axis_through_pcs + axis_between_pcs) // 4
+
+
+def _totient(n):
+    "return the number of integers in 1..n that are coprime to n"
+    return sum(1 for k in range(1, n + 1) if gcd(n, k) == 1)
+
+
+def rows(
+    univ=PC_UNIVERSE,
+    all_interval=False,
+    hexachord=None,
+    derived_from=None,
+    constraint=None,
+    symmetry="TIR",
+    processes=1,
+):
+    """yield, as PitchClassSequences beginning on pc 0, the rows of univ that
+    meet every given constraint:
+    - all_interval: the intervals between successive pcs are all different
+    - hexachord: the first half of the row belongs to the set class (TnI) of
+      this PitchClassSet
+    - derived_from: each discrete segment of the row belongs to the set class
+      (TnI) of this PitchClassSet
+    - constraint: a function of a list of pcs that is true for every
+      beginning of a row that may be part of a row that meets it
+    Only one row is yielded from each class of rows that meet the constraints
+    and are related by the operations in symmetry: T (transposition), I
+    (inversion), R (retrograde) and M (multiplication by any unit, which
+    includes inversion). With processes > 1, the search is split between a
+    pool of processes; rows are yielded in the same order either way. The
+    constraint is then sent to each process, so it must be picklable (a
+    function defined at the top level of a module, not a lambda)."""
+    search = _RowSearch(
+        univ, all_interval, hexachord, derived_from, constraint, symmetry
+    )
+    if processes == 1:
+        found = [search.rows_below([0])]
+    else:
+        try:
+            pickle.dumps(search)
+        except (pickle.PicklingError, AttributeError, TypeError) as error:
+            raise TypeError(
+                "constraint must be picklable to search with processes > 1"
+            ) from error
+        prefixes = list(search.prefixes([0], min(3, univ)))
+        executor = ProcessPoolExecutor(processes)
+        found = executor.map(search.rows_below_list, prefixes)
+    try:
+        for row_group in found:
+            for row in row_group:
+                yield PitchClassSequence(row, univ=univ)
+    finally:
+        if processes != 1:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _RowSearch:
+    "the constraints of a call to rows(), with the backtracking search over them"
+
+    def __init__(
+        self, univ, all_interval, hexachord, derived_from, constraint, symmetry
+    ):
+        self.univ = univ
+        self.all_interval = all_interval
+        self.constraint = constraint
+        self.hexachord_masks = None
+        if hexachord is not None:
+            mask = _rescaled_mask(hexachord._mask, hexachord.univ, univ)
+            if univ % 2 or mask.bit_count() != univ // 2:
+                raise ValueError("hexachord must contain half of the pcs of univ")
+            self.hexachord_masks = _tni_images(mask, univ)
+        self.derived = None
+        if derived_from is not None:
+            mask = _rescaled_mask(derived_from._mask, derived_from.univ, univ)
+            size = mask.bit_count()
+            if not size or univ % size:
+                raise ValueError("derived_from must have a cardinality dividing univ")
+            self.derived = size, _prime_mask(mask, univ)
+        if not set(symmetry) <= set("TIRM"):
+            raise ValueError("symmetry must be made of the letters T, I, R and M")
+        self.multipliers = [1]
+        if "M" in symmetry:
+            self.multipliers += [m for m in range(2, univ) if gcd(m, univ) == 1]
+        elif "I" in symmetry and univ > 2:
+            self.multipliers.append(univ - 1)
+        self.retrogrades = [False, True] if "R" in symmetry else [False]
+        self.checks_prefixes = (
+            hexachord is not None or derived_from is not None or constraint is not None
+        )
+
+    def prefixes(self, prefix, length):
+        "yield the beginnings of rows of the given length that may meet the constraints"
+        used = _pcs_to_mask(prefix, self.univ)
+        intervals = _pcs_to_mask(
+            ((b - a) % self.univ for a, b in zip(prefix, prefix[1:])), self.univ
+        )
+        yield from self._extended(list(prefix), used, intervals, length)
+
+    def _extended(self, prefix, used, intervals, length):
+        if len(prefix) == length:
+            yield list(prefix)
+            return
+        last = prefix[-1]
+        for pc in range(self.univ):
+            if used >> pc & 1:
+                continue
+            interval_bit = 1 << (pc - last) % self.univ
+            if self.all_interval and intervals & interval_bit:
+                continue
+            prefix.append(pc)
+            if not self.checks_prefixes or self._allows(prefix, used | 1 << pc):
+                yield from self._extended(
+                    prefix, used | 1 << pc, intervals | interval_bit, length
+                )
+            prefix.pop()
+
+    def rows_below(self, prefix):
+        "yield each row beginning with prefix that is the first of its class"
+        for row in self.prefixes(prefix, self.univ):
+            if self.is_first_of_class(row):
+                yield row
+
+    def rows_below_list(self, prefix):
+        return list(self.rows_below(prefix))
+
+    def _allows(self, prefix, used):
+        "return whether prefix, which uses the pcs in used, may begin a row"
+        length = len(prefix)
+        if self.hexachord_masks is not None and length <= self.univ // 2:
+            if not any(used & ~mask == 0 for mask in self.hexachord_masks):
+                return False
+        if self.derived is not None and length % self.derived[0] == 0:
+            segment = _pcs_to_mask(prefix[-self.derived[0] :], self.univ)
+            if _prime_mask(segment, self.univ) != self.derived[1]:
+                return False
+        if self.constraint is not None and not self.constraint(prefix):
+            return False
+        return True
+
+    def meets_constraints(self, row):
+        if self.all_interval:
+            intervals = {(b - a) % self.univ for a, b in zip(row, row[1:])}
+            if len(intervals) != self.univ - 1:
+                return False
+        used = 0
+        for length, pc in enumerate(row, 1):
+            used |= 1 << pc
+            if not self._allows(row[:length], used):
+                return False
+        return True
+
+    def is_first_of_class(self, row):
+        """return whether row comes before every other row related to it by
+        the symmetry operations that meets the constraints"""
+        for multiplier in self.multipliers:
+            for retrograde in self.retrogrades:
+                form = [(multiplier * pc) % self.univ for pc in row]
+                if retrograde:
+                    form.reverse()
+                form = [(pc - form[0]) % self.univ for pc in form]
+                if form < row and self.meets_constraints(form):
+                    return False
+        return True
+
+
+def _tni_images(mask, univ):
+    "return the set of bitmasks of the transpositions and inversions of mask"
+    reflected = _reflected(mask, univ)
+    images = {_rotated(mask, n, univ) for n in range(univ)}
+    return images | {_rotated(reflected, n, univ) for n in range(univ)}
+
+
+class Instrumentation:
+    """Counts and total times of calls to the hot paths of this module:
+    constructions, set_pcs, conversions between universes (by mode and
+    universes), the normalization of two sets to a common universe (by the
+    universes and their lcm) and the rescaling of bitmasks it does.
+
+    The hot paths are wrapped only while instrumentation is enabled, by
+    enable(), within an instrumented() block, or from import if the
+    environment variable PITCHCLASSES_INSTRUMENT is set, so it costs nothing
+    otherwise. Times include those of nested calls."""
+
+    def __init__(self):
+        self.enabled = False
+        self._originals = {}
+        self.reset()
+
+    def reset(self):
+        self._counters = {}  # name -> [calls, seconds]
+        self._elapsed = 0.0
+        self._enabled_at = perf_counter()
+
+    def enable(self):
+        if self.enabled:
+            return
+        for owner, name, label in _instrumented_calls():
+            original = owner.__dict__[name]
+            self._originals[owner, name] = original
+            if isinstance(original, classmethod):
+                wrapped = classmethod(self._wrapped(original.__func__, label))
+            else:
+                wrapped = self._wrapped(original, label)
+            setattr(owner, name, wrapped)
+        self.enabled = True
+        self._enabled_at = perf_counter()
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for (owner, name), original in self._originals.items():
+            setattr(owner, name, original)
+        self._originals = {}
+        self.enabled = False
+        self._elapsed += perf_counter() - self._enabled_at
+
+    def _wrapped(self, function, label):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = perf_counter() - start
+                counter = self._counters.setdefault(label(*args, **kwargs), [0, 0.0])
+                counter[0] += 1
+                counter[1] += seconds
+
+        return wrapper
+
+    def elapsed(self):
+        "return the seconds for which instrumentation has been enabled"
+        if self.enabled:
+            return self._elapsed + perf_counter() - self._enabled_at
+        return self._elapsed
+
+    def snapshot(self):
+        """return a dictionary of the calls and seconds counted for each name,
+        and the seconds for which instrumentation has been enabled"""
+        return {
+            "elapsed": self.elapsed(),
+            "counters": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in self._counters.items()
+            },
+        }
+
+    def report(self, limit=None):
+        """return a table of the counters, slowest first, giving the share of
+        the enabled time that each accounts for"""
+        elapsed = self.elapsed() or 1.0
+        counters = sorted(self._counters.items(), key=lambda item: -item[1][1])
+        lines = ["{:<44} {:>10} {:>12} {:>7}".format("", "calls", "seconds", "%")]
+        for name, (calls, seconds) in counters[:limit]:
+            share = 100 * seconds / elapsed
+            lines.append(
+                "{:<44} {:>10} {:>12.6f} {:>6.1f}%".format(name, calls, seconds, share)
+            )
+        return "\n".join(lines)
+
+
+instrumentation = Instrumentation()
+
+
+@contextmanager
+def instrumented():
+    """enable instrumentation, with its counters reset, for the duration of a
+    with block, and yield it"""
+    was_enabled = instrumentation.enabled
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        yield instrumentation
+    finally:
+        if not was_enabled:
+            instrumentation.disable()
+
+
+def _instrumented_calls():
+    "return (owner, attribute name, counter name function) for each hot path"
+    module = sys.modules[__name__]
+
+    def construction(pc_object, *args, **kwargs):
+        return "construct {}".format(type(pc_object).__name__)
+
+    def construction_from(cls, *args, **kwargs):
+        return "construct {}".format(cls.__name__)
+
+    def set_pcs(pc_object, pcs):
+        return "set_pcs {}".format(type(pc_object).__name__)
+
+    def as_univ(pc_object, new_univ, mode="e"):
+        return "as_univ {} {}->{}".format(mode, pc_object.univ, new_univ)
+
+    def rescaled_mask(mask, univ, new_univ, mode="e"):
+        return "as_univ {} {}->{}".format(mode, univ, new_univ)
+
+    def normalization(pc_set, other):
+        univ = lcm(pc_set.univ, other.univ)
+        return "normalize {},{}->{}".format(pc_set.univ, other.univ, univ)
+
+    def spread_mask(mask, univ, factor):
+        return "rescale mask {}->{}".format(univ, univ * factor)
+
+    return [
+        (PitchClasses, "__init__", construction),
+        (PitchClassSet, "_from_mask", construction_from),
+        (PitchClassSequence, "_from_data", construction_from),
+        (PitchClassSet, "set_pcs", set_pcs),
+        (PitchClassSequence, "set_pcs", set_pcs),  # also for frozen sequences
+        (PitchClasses, "_as_univ", as_univ),
+        (module, "_rescaled_mask", rescaled_mask),
+        (PitchClassSet, "_masks_in_normalized_univ", normalization),
+        (module, "_spread_mask", spread_mask),
+    ]
+
+
+if os.environ.get("PITCHCLASSES_INSTRUMENT"):
+    instrumentation.enable()
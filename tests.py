@@ -1,12 +1,43 @@
+import os
+import pickle
+import tempfile
 import unittest
+import batch
+import pitchclasses
 from pitchclasses import (
     PitchClassSet,
     PitchClassSequence,
+    PitchClassSetArray,
+    FrozenPitchClassSet,
+    FrozenPitchClassSequence,
+    InternPool,
+    RowMatrix,
+    ContainmentIndex,
+    VectorIndex,
+    VoiceLeadingIndex,
+    MotifIndex,
     IntervalVector,
     IntervalSequence,
+    LazyMelody,
     SetSequence,
+    SetStream,
+    Transformation,
+    transformations_between,
+    similarity_matrix,
+    Corpus,
+    dumps,
+    loads,
+    write_corpus,
+    set_table_cache,
+    build_table_cache,
     aggregate,
     maximally_distributed,
+    set_class_catalog,
+    set_classes,
+    set_class_count,
+    rows,
+    instrumentation,
+    instrumented,
 )
 
 
@@ -27,6 +58,45 @@ class PitchClassSetTest(unittest.TestCase):
         self.assertEqual(test_set.pcs, [0, 1])  # pcs should be sorted
         self.assertEqual(test_set.cardinality, 2)
 
+    def test_private_from_mask(self):
+        test_set = PitchClassSet._from_mask(0b10011, 12)
+        self.assertIsInstance(test_set, PitchClassSet)
+        self.assertEqual(test_set.pcs, [0, 1, 4])
+        self.assertEqual(test_set.cardinality, 3)
+        self.assertFalse(hasattr(test_set, "__dict__"))
+
+    def test_pcs_copy(self):
+        test_set = PitchClassSet([0, 4])
+        test_set.pcs.append(7)
+        self.assertEqual(test_set.pcs, [0, 4])
+        self.assertEqual(test_set.cardinality, 2)
+        test_set.pcs = test_set.pcs + [7]
+        self.assertIn(7, test_set)
+
+    def test_magic_contains(self):
+        test_set = PitchClassSet([0, 4, 7])
+        self.assertIn(4, test_set)
+        self.assertIn(16, test_set)  # pcs are taken modulo univ
+        self.assertNotIn(5, test_set)
+
+    def test_comparisons(self):
+        test_set_0 = PitchClassSet([0, 4])
+        test_set_1 = PitchClassSet([0, 4, 7])
+        self.assertTrue(test_set_0 < test_set_1)
+        self.assertTrue(test_set_0 <= test_set_1)
+        self.assertTrue(test_set_1 > test_set_0)
+        self.assertFalse(test_set_1 < test_set_1)
+        self.assertTrue(test_set_1 >= test_set_1)
+        self.assertTrue(PitchClassSet([0, 1]) < test_set_1)  # compared as lists
+        self.assertTrue(PitchClassSet([5]) > test_set_1)
+        returned_0 = sorted(
+            [PitchClassSet([2]), PitchClassSet([0, 5]), PitchClassSet([1])]
+        )
+        self.assertEqual([s.pcs for s in returned_0], [[0, 5], [1], [2]])
+        test_set_2 = PitchClassSet([0, 1, 2], univ=3)
+        self.assertTrue(test_set_2 == PitchClassSet([0, 4, 8]))
+        self.assertTrue(test_set_2 != test_set_1)
+
     def test_magic_sub(self):
         test_set_0 = PitchClassSet([0, 1, 2])
         test_set_1 = PitchClassSet([2, 3])
@@ -156,6 +226,23 @@ class PitchClassSetTest(unittest.TestCase):
         returned_3 = test_set._as_univ(12, "c")
         self.assertEqual(returned_3, [0, 3, 5, 8, 10])
 
+    def test_private_as_univ_exact(self):
+        test_set = PitchClassSet([0, 39], univ=78)
+        returned_0 = test_set._as_univ(62)  # 39 * 62 / 78 is 30.999... in floats
+        self.assertEqual(returned_0, [0, 31])
+        with self.assertRaises(ValueError):
+            test_set._as_univ(12, "x")
+
+    def test_private_mask_in_univ(self):
+        test_set = PitchClassSet([0, 1, 5], univ=53)
+        self.assertEqual(test_set._mask_in_univ(53), test_set._mask)
+        returned_0 = test_set._mask_in_univ(106)
+        self.assertEqual(returned_0, 0b10000000101)
+        self.assertEqual(test_set._scaled_masks, {106: returned_0})
+        test_set.transpose(1)
+        self.assertIsNone(test_set._scaled_masks)
+        self.assertTrue(test_set | PitchClassSet([0], univ=72) < test_set)
+
     def test_as_univ(self):
         test_set = aggregate(7)
         with self.assertRaises(ValueError):
@@ -198,6 +285,52 @@ class PitchClassSetTest(unittest.TestCase):
         returned_1 = test_set_1.vector()
         self.assertEqual(returned_1.intervals, [2, 5, 4, 3, 6, 1])
 
+    def test_normal_form(self):
+        test_set_0 = PitchClassSet([8, 0, 3])
+        returned_0 = test_set_0.normal_form()
+        self.assertIsInstance(returned_0, PitchClassSequence)
+        self.assertEqual(returned_0.pcs, [8, 0, 3])
+        test_set_1 = PitchClassSet([0, 4, 8])
+        self.assertEqual(test_set_1.normal_form().pcs, [0, 4, 8])  # ties start lowest
+        test_set_2 = PitchClassSet([0, 5, 9], univ=19)
+        self.assertEqual(test_set_2.normal_form().pcs, [0, 5, 9])
+        self.assertEqual(PitchClassSet([]).normal_form().pcs, [])
+
+    def test_prime_form(self):
+        test_set_0 = PitchClassSet([8, 0, 3])
+        returned_0 = test_set_0.prime_form()
+        self.assertIsInstance(returned_0, PitchClassSet)
+        self.assertEqual(returned_0.pcs, [0, 3, 7])
+        returned_1 = test_set_0.prime_form("Tn")
+        self.assertEqual(returned_1.pcs, [0, 4, 7])
+        test_set_1 = PitchClassSet([1, 2, 4, 7, 8], univ=17)  # beyond the tables
+        self.assertEqual(test_set_1.prime_form().pcs, [0, 1, 3, 6, 7])
+        with self.assertRaises(ValueError):
+            test_set_0.prime_form("T")
+
+    def test_set_class(self):
+        self.assertEqual(PitchClassSet([8, 0, 3]).set_class(), "3-11")
+        self.assertEqual(PitchClassSet([8, 0, 3]).set_class("Tn"), "3-11B")
+        self.assertEqual(PitchClassSet([0, 3, 7]).set_class("Tn"), "3-11A")
+        self.assertEqual(PitchClassSet([0, 4, 8]).set_class("Tn"), "3-12")
+        self.assertEqual(PitchClassSet([0, 1, 4, 6]).set_class(), "4-Z15")
+        self.assertEqual(PitchClassSet([0, 1, 4, 6]).complement().set_class(), "8-Z15")
+        self.assertEqual(PitchClassSet([0, 2, 4, 6, 8, 10]).set_class(), "6-35")
+        self.assertEqual(PitchClassSet([0, 5, 9], univ=19).set_class(), "3-[0,4,9]")
+        names = {PitchClassSet._from_mask(mask, 12).set_class() for mask in range(4096)}
+        self.assertEqual(len(names), 224)
+
+    def test_vector_large(self):
+        returned_0 = aggregate(72).vector()  # large sets use autocorrelation
+        self.assertEqual(returned_0.intervals, [72] * 35 + [36])
+        test_set_1 = PitchClassSet(range(0, 1200, 7), univ=1200)
+        returned_1 = test_set_1.vector()
+        self.assertEqual(len(returned_1.intervals), 600)
+        self.assertEqual(sum(returned_1.intervals), 172 * 171 // 2)
+        self.assertEqual(returned_1.intervals[6], 171)  # every step of 7
+        test_set_2 = PitchClassSet(range(0, 1200, 3), univ=1200)
+        self.assertEqual(test_set_2.vector().intervals[599], 200)
+
     def test_copy(self):
         test_set_0 = PitchClassSet([0])
         returned_0 = test_set_0.copy()
@@ -226,12 +359,115 @@ class PitchClassSetTest(unittest.TestCase):
         self.assertEqual(test_set_0.pcs, [0, 1, 2])
         self.assertEqual(test_set_0.univ, 4)
 
+    def test_voice_leading(self):
+        test_set = PitchClassSet([0, 4, 7])
+        self.assertEqual(test_set.voice_leading(PitchClassSet([0, 3, 7])), 1)
+        self.assertEqual(test_set.voice_leading(PitchClassSet([11, 2, 7])), 3)
+        self.assertEqual(test_set.voice_leading(PitchClassSet([11, 2, 7]), "Linf"), 2)
+        returned_0 = test_set.voice_leading(PitchClassSet([0, 3, 6, 9]), "L2")
+        self.assertAlmostEqual(returned_0, 6**0.5)
+        self.assertEqual(test_set.voice_leading(PitchClassSet([1, 8])), 5)
+        self.assertEqual(test_set.voice_leading(PitchClassSet([1, 9, 15], 24)), 1.5)
+        returned_1 = PitchClassSet([1, 9, 15], 24).voice_leading(test_set)
+        self.assertEqual(returned_1, 3)
+        with self.assertRaises(ValueError):
+            test_set.voice_leading(PitchClassSet([]))
+        with self.assertRaises(ValueError):
+            test_set.voice_leading(test_set, "L3")
+
+    def test_smoothest_transposition(self):
+        test_set = PitchClassSet([0, 4, 7])
+        returned_0 = test_set.smoothest_transposition(PitchClassSet([0, 3, 7]))
+        self.assertEqual(returned_0, (0, 1))
+        returned_1 = test_set.smoothest_transposition(PitchClassSet([0, 2, 7]), "L2")
+        self.assertEqual(returned_1, (5, 1.0))
+
+    def test_symmetries(self):
+        returned_0 = PitchClassSet([1, 2, 3]).symmetries()
+        self.assertEqual([t.name for t in returned_0], ["T0", "T4I"])
+        returned_1 = PitchClassSet([0, 1, 6, 7]).symmetries()
+        self.assertEqual([t.name for t in returned_1], ["T0", "T6", "T1I", "T7I"])
+        returned_2 = PitchClassSet([0, 1, 4, 6]).symmetries(multiplication=True)
+        self.assertEqual(returned_2, [Transformation()])
+        returned_3 = PitchClassSet([0, 1, 3, 6]).symmetries(multiplication=True)
+        self.assertEqual(returned_3, [Transformation(), Transformation(7, 6)])
+
+    def test_transformations_to(self):
+        test_set = PitchClassSet([0, 1, 4])
+        returned_0 = test_set.transformations_to(PitchClassSet([3, 6, 7]))
+        self.assertEqual(returned_0, [Transformation(-1, 7)])
+        returned_1 = PitchClassSet([0, 1, 6, 7]).transformations_to(
+            PitchClassSet([1, 2, 7, 8])
+        )
+        self.assertEqual([t.name for t in returned_1], ["T1", "T7", "T2I", "T8I"])
+        self.assertEqual(test_set.transformations_to(PitchClassSet([0, 4, 8])), [])
+        returned_2 = PitchClassSet([0, 1, 3, 6]).transformations_to(
+            PitchClassSet([0, 6, 7, 9]), multiplication=True
+        )
+        self.assertEqual([t.name for t in returned_2], ["T6", "T0M7"])
+
+    def test_transformations_into(self):
+        test_set = PitchClassSet([0, 4, 7])
+        major_scale = PitchClassSet([0, 2, 4, 5, 7, 9, 11])
+        returned_0 = test_set.transformations_into(major_scale)
+        expected_0 = ["T0", "T5", "T7", "T4I", "T9I", "T11I"]
+        self.assertEqual([t.name for t in returned_0], expected_0)
+        self.assertEqual(major_scale.transformations_into(test_set), [])
+
+    def test_similarity(self):
+        test_set = PitchClassSet([0, 1, 2])
+        augmented = PitchClassSet([0, 4, 8])
+        self.assertEqual(test_set.similarity(augmented), 6)
+        self.assertAlmostEqual(test_set.similarity(augmented, "IcVSIM"), 1.5275, 4)
+        related = PitchClassSet([0, 1, 3])
+        self.assertEqual(test_set.similarity(related, "ATMEMB"), 0.625)
+        self.assertAlmostEqual(test_set.similarity(related, "REL"), 0.6036, 4)
+        self.assertEqual(test_set.similarity(related, "Rp"), 1.0)
+        self.assertEqual(test_set.similarity(augmented, "Rp"), 0.0)
+        z_related = PitchClassSet([0, 1, 4, 6]), PitchClassSet([0, 1, 3, 7])
+        self.assertEqual(z_related[0].similarity(z_related[1]), 0)
+        self.assertLess(z_related[0].similarity(z_related[1], "REL"), 1)
+        for measure in ("ATMEMB", "REL"):
+            returned_0 = test_set.similarity(test_set.inverted(5), measure)
+            self.assertEqual(returned_0, 1.0)
+        with self.assertRaises(ValueError):
+            test_set.similarity(augmented, "SIMILAR")
+
+    def test_injection(self):
+        test_set = PitchClassSet([0, 4, 7])
+        major_scale = PitchClassSet([0, 2, 4, 5, 7, 9, 11])
+        self.assertEqual(test_set.injection(major_scale, Transformation(1, 1)), 1)
+        self.assertEqual(test_set.injection(major_scale, Transformation(1, 2)), 2)
+        self.assertEqual(test_set.injection(major_scale, Transformation(-1, 4)), 3)
+        self.assertEqual(test_set.injection(major_scale, Transformation(0, 1)), 0)
+
+    def test_degree_of_symmetry(self):
+        self.assertEqual(PitchClassSet([0, 4, 8]).degree_of_symmetry(), 6)
+        self.assertEqual(PitchClassSet([0, 4, 7]).degree_of_symmetry(), 1)
+        whole_tone = PitchClassSet([0, 2, 4, 6, 8, 10])
+        self.assertEqual(whole_tone.degree_of_symmetry(multiplication=True), 24)
+
+    def test_is_limited_transposition(self):
+        octatonic = PitchClassSet([0, 1, 3, 4, 6, 7, 9, 10])
+        self.assertTrue(octatonic.is_limited_transposition())
+        self.assertFalse(
+            PitchClassSet([0, 2, 4, 5, 7, 9, 11]).is_limited_transposition()
+        )
+
 
 class PitchClassSequenceTest(unittest.TestCase):
     def test_init(self):
         test_sequence = PitchClassSequence([0])
         self.assertIsInstance(test_sequence, PitchClassSequence)
 
+    def test_pcs_copy(self):
+        test_sequence = PitchClassSequence([0, 4])
+        test_sequence.pcs.append(7)
+        test_sequence.pcs[0] = 3
+        self.assertEqual(test_sequence.pcs, [0, 4])
+        test_sequence.pcs = [3, 4, 7]
+        self.assertEqual(test_sequence[0], 3)
+
     def test_attribute_types(self):
         test_sequence = PitchClassSequence([0])
         self.assertIsInstance(test_sequence.pcs, list)
@@ -242,6 +478,13 @@ class PitchClassSequenceTest(unittest.TestCase):
         test_sequence.set_pcs([0, 1, 0])
         self.assertEqual(test_sequence.pcs, [0, 1, 0])
 
+    def test_hashable(self):
+        test_sequence_0 = PitchClassSequence([0, 4, 8, 4])
+        test_sequence_1 = PitchClassSequence([0, 4, 8, 4])
+        self.assertEqual(len({test_sequence_0, test_sequence_1}), 2)
+        self.assertNotEqual(test_sequence_0, test_sequence_1)
+        self.assertNotEqual(test_sequence_0, test_sequence_1.frozen())
+
     def test_magic_add(self):
         test_sequence_0 = PitchClassSequence([0, 1, 2])
         test_sequence_1 = PitchClassSequence([1, 2])
@@ -264,6 +507,36 @@ class PitchClassSequenceTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             test_sequence_0.append(4.0)
 
+    def test_magic_getitem(self):
+        test_sequence = PitchClassSequence([0, 1, 2, 3, 4, 5])
+        self.assertEqual(test_sequence[1], 1)
+        self.assertEqual(test_sequence[-1], 5)
+        returned_0 = test_sequence[1:5]
+        self.assertIsInstance(returned_0, PitchClassSequence)
+        self.assertEqual(returned_0.pcs, [1, 2, 3, 4])
+        self.assertEqual(len(returned_0), 4)
+        self.assertEqual(returned_0[::-2].pcs, [4, 2])
+        self.assertEqual(test_sequence[::-1].pcs, [5, 4, 3, 2, 1, 0])
+        self.assertEqual(test_sequence[4:4].pcs, [])
+
+    def test_views(self):
+        test_sequence = PitchClassSequence([0, 1, 2, 3, 4, 5])
+        returned_0 = test_sequence[:3]
+        test_sequence.append(6)
+        test_sequence.transpose(1)
+        self.assertEqual(returned_0.pcs, [0, 1, 2])
+        returned_0.append(7)
+        returned_0.invert(0)
+        self.assertEqual(returned_0.pcs, [0, 11, 10, 5])
+        self.assertEqual(test_sequence.pcs, [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(returned_0.intervals().intervals, [11, 11, 7])
+
+    def test_large_univ(self):
+        test_sequence = PitchClassSequence([2**69, 1], univ=2**70)
+        self.assertEqual(test_sequence.transposed(2**69).pcs, [0, 2**69 + 1])
+        test_sequence.append(-1)
+        self.assertEqual(test_sequence[-1], 2**70 - 1)
+
     def test_private_transposed(self):
         test_sequence = PitchClassSequence([0, 1, 0])
         returned_0 = test_sequence._transposed(1)
@@ -404,6 +677,445 @@ class PitchClassSequenceTest(unittest.TestCase):
         self.assertEqual(test_sequence_0.univ, 4)
 
 
+class FrozenPitchClassSetTest(unittest.TestCase):
+    def test_init(self):
+        test_set = FrozenPitchClassSet([0, 4, 7])
+        self.assertIsInstance(test_set, PitchClassSet)
+        self.assertEqual(test_set.pcs, [0, 4, 7])
+
+    def test_hash(self):
+        test_set_0 = FrozenPitchClassSet([0, 4, 8])
+        test_set_1 = PitchClassSet([0, 1, 2], univ=3).frozen()
+        self.assertEqual(test_set_0, test_set_1)
+        self.assertEqual(hash(test_set_0), hash(test_set_1))
+        self.assertEqual(len({test_set_0, test_set_1, FrozenPitchClassSet([0])}), 2)
+        with self.assertRaises(TypeError):
+            hash(PitchClassSet([0]))
+
+    def test_immutable(self):
+        test_set = FrozenPitchClassSet([0, 4, 7])
+        with self.assertRaises(TypeError):
+            test_set.transpose(1)
+        with self.assertRaises(TypeError):
+            test_set.set_univ(24)
+        with self.assertRaises(TypeError):
+            test_set.pcs = [1]
+        self.assertEqual(test_set.univ, 12)
+        self.assertEqual(test_set.pcs, [0, 4, 7])
+        returned_0 = test_set.transposed(1)
+        self.assertNotIsInstance(returned_0, FrozenPitchClassSet)
+        self.assertEqual(returned_0.pcs, [1, 5, 8])
+
+    def test_copy(self):
+        test_set = FrozenPitchClassSet([0, 4, 7])
+        returned_0 = test_set.copy()
+        returned_0.transpose(1)
+        self.assertEqual(returned_0.pcs, [1, 5, 8])
+
+
+class FrozenPitchClassSequenceTest(unittest.TestCase):
+    def test_hash(self):
+        test_sequence_0 = FrozenPitchClassSequence([0, 8, 4])
+        test_sequence_1 = PitchClassSequence([0, 2, 1], univ=3).frozen()
+        self.assertEqual(test_sequence_0, test_sequence_1)
+        self.assertEqual(hash(test_sequence_0), hash(test_sequence_1))
+        self.assertNotEqual(test_sequence_0, FrozenPitchClassSequence([0, 4, 8]))
+
+    def test_magic_eq(self):
+        test_sequence_0 = FrozenPitchClassSequence([0, 4, 8, 4])
+        self.assertEqual(test_sequence_0, FrozenPitchClassSequence([0, 4, 8, 4]))
+        self.assertEqual(
+            test_sequence_0, FrozenPitchClassSequence([0, 1, 2, 1], univ=3)
+        )
+        self.assertNotEqual(test_sequence_0, FrozenPitchClassSequence([0, 4, 8]))
+        self.assertNotEqual(test_sequence_0, [0, 4, 8, 4])
+
+    def test_immutable(self):
+        test_sequence = FrozenPitchClassSequence([0, 1, 2])
+        with self.assertRaises(TypeError):
+            test_sequence.append(3)
+        with self.assertRaises(TypeError):
+            test_sequence.retrograde()
+        with self.assertRaises(TypeError):
+            test_sequence.extend(PitchClassSequence([3]))
+        self.assertEqual(list(test_sequence.pcs), [0, 1, 2])
+        returned_0 = test_sequence + PitchClassSequence([3])
+        self.assertEqual(returned_0.pcs, [0, 1, 2, 3])
+
+    def test_pickle(self):
+        test_sequence = FrozenPitchClassSequence([0, 4, 8], univ=24)
+        returned_0 = pickle.loads(pickle.dumps(test_sequence))
+        self.assertEqual(returned_0, test_sequence)
+        self.assertEqual(hash(returned_0), hash(test_sequence))
+        returned_1 = pickle.loads(pickle.dumps(FrozenPitchClassSet([0, 4, 8])))
+        self.assertEqual(returned_1, FrozenPitchClassSet([0, 4, 8]))
+
+
+class InternPoolTest(unittest.TestCase):
+    def test_intern(self):
+        test_pool = InternPool()
+        returned_0 = test_pool.intern(PitchClassSet([0, 4, 7]))
+        self.assertIsInstance(returned_0, FrozenPitchClassSet)
+        returned_1 = test_pool.intern(PitchClassSet([0, 4, 7]))
+        self.assertIs(returned_0, returned_1)
+        returned_2 = test_pool.intern(PitchClassSequence([0, 4, 7]))
+        self.assertIsInstance(returned_2, FrozenPitchClassSequence)
+        self.assertEqual(len(test_pool), 2)
+
+    def test_eviction(self):
+        test_pool = InternPool(maxsize=2)
+        test_pool.intern(PitchClassSet([0]))
+        test_pool.intern(PitchClassSet([1]))
+        test_pool.intern(PitchClassSet([0]))  # [1] is now least recently used
+        test_pool.intern(PitchClassSet([2]))
+        self.assertEqual(len(test_pool), 2)
+        self.assertIn(PitchClassSet([0]), test_pool)
+        self.assertNotIn(PitchClassSet([1]), test_pool)
+
+
+class PitchClassSetArrayTest(unittest.TestCase):
+    def test_init(self):
+        test_array = PitchClassSetArray([[0, 4, 7], (1, 13)])
+        self.assertIsInstance(test_array, PitchClassSetArray)
+        self.assertEqual(test_array.univ, 12)
+        self.assertEqual(len(test_array), 2)
+        self.assertEqual(test_array[1].pcs, [1])
+
+    def test_from_sets(self):
+        test_sets = [PitchClassSet([0, 4, 7]), PitchClassSet([1, 2])]
+        returned_0 = PitchClassSetArray.from_sets(test_sets)
+        self.assertIsInstance(returned_0, PitchClassSetArray)
+        self.assertEqual(returned_0.masks, [s._mask for s in test_sets])
+        with self.assertRaises(ValueError):
+            PitchClassSetArray.from_sets([PitchClassSet([0]), PitchClassSet([0], 7)])
+
+    def test_to_sets(self):
+        test_array = PitchClassSetArray([[0, 4, 7], [1, 2]])
+        returned_0 = test_array.to_sets()
+        self.assertIsInstance(returned_0[0], PitchClassSet)
+        self.assertEqual([s.pcs for s in returned_0], [[0, 4, 7], [1, 2]])
+
+    def test_getitem(self):
+        test_array = PitchClassSetArray([[0], [1], [2]])
+        self.assertIsInstance(test_array[0], PitchClassSet)
+        returned_0 = test_array[1:]
+        self.assertIsInstance(returned_0, PitchClassSetArray)
+        self.assertEqual([s.pcs for s in returned_0], [[1], [2]])
+
+    def test_operators(self):
+        test_array_0 = PitchClassSetArray([[0, 1, 2], [0, 4, 7]])
+        test_array_1 = PitchClassSetArray([[2, 3], [7]])
+        self.assertEqual([s.pcs for s in test_array_0 - test_array_1], [[0, 1], [0, 4]])
+        self.assertEqual([s.pcs for s in test_array_0 & test_array_1], [[2], [7]])
+        returned_0 = test_array_0 ^ test_array_1
+        self.assertEqual([s.pcs for s in returned_0], [[0, 1, 3], [0, 4]])
+        returned_1 = test_array_0 | PitchClassSet([1, 2], univ=4)
+        self.assertEqual(returned_1.univ, 12)
+        expected = [[0, 1, 2, 3, 6], [0, 3, 4, 6, 7]]
+        self.assertEqual([s.pcs for s in returned_1], expected)
+        with self.assertRaises(ValueError):
+            test_array_0 | test_array_1[:1]
+
+    def test_transposed(self):
+        test_array = PitchClassSetArray([[0, 1, 2], [0, 4, 7]])
+        returned_0 = test_array.transposed(11)
+        self.assertIsInstance(returned_0, PitchClassSetArray)
+        self.assertEqual([s.pcs for s in returned_0], [[0, 1, 11], [3, 6, 11]])
+
+    def test_inverted(self):
+        test_array = PitchClassSetArray([[0, 1, 2], [0, 4, 7]])
+        returned_0 = test_array.inverted(0)
+        self.assertEqual([s.pcs for s in returned_0], [[0, 10, 11], [0, 5, 8]])
+
+    def test_m_transformed(self):
+        test_array = PitchClassSetArray([[0, 1, 2], [0, 4, 7]])
+        returned_0 = test_array.m_transformed(5)
+        self.assertEqual([s.pcs for s in returned_0], [[0, 5, 10], [0, 8, 11]])
+
+    def test_as_univ(self):
+        test_array = PitchClassSetArray([[0, 1, 2, 3, 4]], univ=5)
+        with self.assertRaises(ValueError):
+            test_array.as_univ(12)
+        self.assertEqual(test_array.as_univ(12, "d")[0].pcs, [0])
+        self.assertEqual(test_array.as_univ(12, "f")[0].pcs, [0, 2, 4, 7, 9])
+        self.assertEqual(test_array.as_univ(12, "r")[0].pcs, [0, 2, 5, 7, 10])
+        self.assertEqual(test_array.as_univ(12, "c")[0].pcs, [0, 3, 5, 8, 10])
+        self.assertEqual(test_array.as_univ(10).masks, [0b0101010101])
+
+    def test_complement(self):
+        test_array = PitchClassSetArray([[0, 1, 2], list(range(12))])
+        returned_0 = test_array.complement()
+        self.assertEqual([s.pcs for s in returned_0], [list(range(3, 12)), []])
+
+    def test_vector(self):
+        test_array = PitchClassSetArray([[0, 1, 2], [0, 2, 4, 5, 7, 9, 11]])
+        returned_0 = test_array.vector()
+        self.assertIsInstance(returned_0[0], IntervalVector)
+        self.assertEqual(returned_0[0].intervals, [2, 1, 0, 0, 0, 0])
+        self.assertEqual(returned_0[1].intervals, [2, 5, 4, 3, 6, 1])
+
+
+class TransformationTest(unittest.TestCase):
+    def test_init(self):
+        test_transformation = Transformation(-1, 15)
+        self.assertEqual(test_transformation.multiplier, 11)
+        self.assertEqual(test_transformation.transposition, 3)
+        self.assertEqual(test_transformation.name, "T3I")
+        self.assertEqual(Transformation.from_name("T3I"), test_transformation)
+        self.assertEqual(Transformation.from_name("T2M5", univ=12).multiplier, 5)
+        with self.assertRaises(ValueError):
+            Transformation.from_name("I3")
+
+    def test_algebra(self):
+        t_2 = Transformation(1, 2)
+        i_0 = Transformation(-1, 0)
+        self.assertEqual(i_0 * t_2, Transformation(-1, -2))
+        self.assertEqual(t_2 * i_0, Transformation(-1, 2))
+        self.assertEqual(len({t_2, Transformation(1, 14), i_0}), 2)
+        m_5 = Transformation(5, 3)
+        self.assertEqual(m_5.inverse() * m_5, Transformation())
+        with self.assertRaises(ValueError):
+            Transformation(2, 0).inverse()
+        with self.assertRaises(ValueError):
+            t_2 * Transformation(1, 2, univ=24)
+
+    def test_call(self):
+        test_transformation = Transformation(5, 1) * Transformation(-1, 3)
+        self.assertEqual(test_transformation(4), 8)
+        returned_0 = test_transformation(PitchClassSet([0, 4, 7]))
+        self.assertEqual(returned_0.pcs, [4, 5, 8])
+        returned_1 = test_transformation(PitchClassSequence([0, 4, 7]))
+        self.assertEqual(returned_1.pcs, [4, 8, 5])
+        returned_2 = test_transformation(PitchClassSetArray([[0, 4, 7], [1]]))
+        self.assertEqual([s.pcs for s in returned_2], [[4, 5, 8], [11]])
+        with self.assertRaises(ValueError):
+            test_transformation(PitchClassSet([0], univ=24))
+
+
+class RowMatrixTest(unittest.TestCase):
+    def test_init(self):
+        test_row = PitchClassSequence([4, 5, 7, 1, 6, 3, 8, 2, 11, 0, 9, 10])
+        test_matrix = RowMatrix(test_row)
+        self.assertIsInstance(test_matrix, RowMatrix)
+        self.assertEqual(test_matrix.univ, 12)
+        with self.assertRaises(ValueError):
+            RowMatrix([0, 1, 2, 2])
+        with self.assertRaises(ValueError):
+            RowMatrix([0, 1, 2], univ=4)
+
+    def test_form(self):
+        test_matrix = RowMatrix([4, 5, 7, 1, 6, 3, 8, 2, 11, 0, 9, 10])
+        returned_0 = test_matrix.form("P0")
+        self.assertIsInstance(returned_0, PitchClassSequence)
+        self.assertEqual(returned_0.pcs, [0, 1, 3, 9, 2, 11, 4, 10, 7, 8, 5, 6])
+        self.assertEqual(test_matrix["I4"].pcs, [4, 3, 1, 7, 2, 5, 0, 6, 9, 8, 11, 10])
+        self.assertEqual(test_matrix["R4"].pcs, [10, 9, 0, 11, 2, 8, 3, 6, 1, 7, 5, 4])
+        self.assertEqual(test_matrix["RI4"].pcs, [10, 11, 8, 9, 6, 0, 5, 2, 7, 1, 3, 4])
+        with self.assertRaises(ValueError):
+            test_matrix.form("Q1")
+        self.assertEqual(len(test_matrix.form_names()), 48)
+
+    def test_matrix(self):
+        test_matrix = RowMatrix([4, 5, 7, 1, 6, 3, 8, 2, 11, 0, 9, 10])
+        returned_0 = test_matrix.matrix()
+        self.assertEqual(len(returned_0), 12)
+        self.assertEqual(returned_0[0], [4, 5, 7, 1, 6, 3, 8, 2, 11, 0, 9, 10])
+        self.assertEqual([row[0] for row in returned_0], test_matrix["I4"].pcs)
+
+    def test_combinatoriality(self):
+        test_matrix_0 = RowMatrix(range(12))
+        returned_0 = test_matrix_0.combinatoriality()
+        self.assertEqual(returned_0, {"P": [6], "I": [11], "R": [0], "RI": [5]})
+        self.assertTrue(test_matrix_0.is_all_combinatorial())
+        test_matrix_1 = RowMatrix([4, 5, 7, 1, 6, 3, 8, 2, 11, 0, 9, 10])
+        returned_1 = test_matrix_1.combinatoriality()
+        self.assertEqual(returned_1, {"P": [], "I": [11], "R": [4], "RI": []})
+        self.assertFalse(test_matrix_1.is_all_combinatorial())
+        with self.assertRaises(ValueError):
+            RowMatrix(range(7), univ=7).combinatoriality()
+
+    def test_invariant_segments(self):
+        test_matrix = RowMatrix(range(12))
+        returned_0 = test_matrix.invariant_segments("P0", "R0", 3)
+        self.assertEqual(returned_0, [(start, 9 - start) for start in range(10)])
+        returned_1 = test_matrix.invariant_segments("P0", "I2", 3)
+        self.assertEqual(returned_1[:2], [(0, 0), (3, 9)])
+        self.assertEqual(test_matrix.invariant_segments("P0", "P6", 7), [])
+
+    def test_find_segment(self):
+        test_matrix = RowMatrix([4, 5, 7, 1, 6, 3, 8, 2, 11, 0, 9, 10])
+        returned_0 = test_matrix.find_segment(PitchClassSet([4, 5, 7]))
+        self.assertEqual(
+            returned_0,
+            [
+                ("P4", 0),
+                ("P9", 7),
+                ("P11", 9),
+                ("I0", 8),
+                ("R4", 9),
+                ("R9", 2),
+                ("R11", 0),
+                ("RI0", 1),
+            ],
+        )
+        returned_1 = test_matrix.find_segment(PitchClassSet([0, 1, 3], univ=6))
+        self.assertEqual(returned_1, [("I3", 1), ("RI3", 8)])
+        self.assertEqual(test_matrix.find_segment(PitchClassSet([0, 1, 2])), [])
+
+
+class ContainmentIndexTest(unittest.TestCase):
+    def test_supersets(self):
+        test_index = ContainmentIndex(set_classes(12, 4))
+        returned_0 = test_index.supersets(PitchClassSet([0, 4, 7]))
+        self.assertEqual(
+            [pc_set.set_class() for pc_set in returned_0],
+            ["4-Z29", "4-18", "4-19", "4-17", "4-20", "4-14", "4-22", "4-27", "4-26"],
+        )
+        self.assertEqual(len(test_index.supersets(PitchClassSet([]))), 29)
+        test_index = ContainmentIndex(set_classes(12, 4), equivalence="Tn")
+        self.assertEqual(len(test_index.supersets(PitchClassSet([0, 4, 7]))), 5)
+        test_index = ContainmentIndex(
+            [PitchClassSet([0, 4, 7]), PitchClassSet([2, 7, 11])], equivalence=None
+        )
+        self.assertEqual(test_index.supersets(PitchClassSet([7])), test_index.pc_sets)
+        self.assertEqual(
+            test_index.supersets(PitchClassSet([4, 7])), test_index.pc_sets[:1]
+        )
+        test_index.add(PitchClassSet([4, 7, 10]))
+        test_index.add(PitchClassSet([1, 4, 7, 10]))
+        returned_1 = test_index.supersets(PitchClassSet([4, 7]), cardinality=3)
+        self.assertEqual(returned_1, [test_index.pc_sets[0], test_index.pc_sets[2]])
+        self.assertEqual(len(test_index.subsets(PitchClassSet([1, 4, 7, 10]))), 2)
+
+    def test_subsets(self):
+        test_index = ContainmentIndex(set_classes(12))
+        returned_0 = test_index.subsets(PitchClassSet([0, 2, 4, 5, 7, 9, 11]), 6)
+        self.assertEqual(
+            [pc_set.set_class() for pc_set in returned_0],
+            ["6-Z25", "6-Z26", "6-33", "6-32"],
+        )
+        test_index.add(PitchClassSet([0, 12], univ=24))
+        self.assertEqual(test_index.subsets(PitchClassSet([0, 6]))[-1].univ, 24)
+        with self.assertRaises(ValueError):
+            test_index.subsets(PitchClassSet([0, 1], univ=24))
+
+
+class VectorIndexTest(unittest.TestCase):
+    def test_sharing(self):
+        test_sets = [[0, 4, 7], [0, 3, 7], [0, 1, 4, 6], [0, 1, 3, 7]]
+        test_index = VectorIndex(PitchClassSet(pcs) for pcs in test_sets)
+        self.assertEqual(len(test_index), 4)
+        self.assertEqual(len(test_index.vectors()), 2)
+        returned_0 = test_index.sharing(PitchClassSet([2, 5, 9]))
+        self.assertEqual([pc_set.pcs for pc_set in returned_0], test_sets[:2])
+        returned_1 = test_index.sharing(PitchClassSet([0, 1, 4, 6]).vector())
+        self.assertEqual(len(returned_1), 2)
+        self.assertEqual(test_index.sharing(PitchClassSet([0, 1, 2])), [])
+        test_index.add(PitchClassSet([0, 2, 8, 12], univ=24))
+        self.assertEqual(len(test_index.sharing(PitchClassSet([0, 1, 4, 6]))), 3)
+
+    def test_z_partners(self):
+        test_index = VectorIndex(set_classes(12))
+        returned_0 = test_index.z_partners(PitchClassSet([0, 1, 4, 6]))
+        self.assertEqual([pc_set.set_class() for pc_set in returned_0], ["4-Z29"])
+        self.assertEqual(test_index.z_partners(PitchClassSet([0, 4, 7])), [])
+        self.assertEqual(test_index.z_partners(PitchClassSet([0])), [])
+        self.assertEqual(len(test_index.z_classes()), 23)
+
+
+class VoiceLeadingIndexTest(unittest.TestCase):
+    def test_nearest(self):
+        test_sets = [[0, 3, 7], [0, 4, 7], [1, 4, 8], [5, 9, 0], [2, 6, 9], [0, 4, 7]]
+        test_index = VoiceLeadingIndex(PitchClassSet(pcs) for pcs in test_sets)
+        returned_0 = test_index.nearest(PitchClassSet([0, 4, 7]), k=4)
+        self.assertEqual([distance for distance, pc_set in returned_0], [0, 0, 1, 2])
+        self.assertIs(returned_0[1][1], test_index.pc_sets[5])
+        self.assertEqual(returned_0[3][1].pcs, [1, 4, 8])
+        returned_1 = test_index.nearest(PitchClassSet([0, 4, 7, 10]), 1, "Linf")
+        self.assertEqual(returned_1, [(2, test_index.pc_sets[0])])
+        returned_2 = test_index.nearest(PitchClassSet([0, 4, 7]), 2, cardinality=4)
+        self.assertEqual(returned_2, [])
+        with self.assertRaises(ValueError):
+            test_index.nearest(PitchClassSet([]))
+
+    def test_nearest_search(self):
+        test_sets = [
+            PitchClassSet(
+                [(i * 7) % 19, (i * i + 3) % 19, (i * 5) % 19][: i % 3 + 1], 19
+            )
+            for i in range(60)
+        ]
+        test_index = VoiceLeadingIndex(test_sets[:40], univ=19)
+        test_index.nearest(test_sets[0])
+        for pc_set in test_sets[40:]:
+            test_index.add(pc_set)
+        test_query = PitchClassSet([1, 6, 12, 15], univ=19)
+        for norm in ("L1", "L2", "Linf"):
+            expected_0 = sorted(test_query.voice_leading(s, norm) for s in test_sets)
+            returned_0 = test_index.nearest(test_query, k=7, norm=norm)
+            self.assertEqual([distance for distance, s in returned_0], expected_0[:7])
+        returned_1 = test_index.nearest(test_query, k=3, cardinality=2)
+        self.assertEqual([len(s) for d, s in returned_1], [2, 2, 2])
+
+    def test_nearest_many(self):
+        test_index = VoiceLeadingIndex(set_classes(12, 3))
+        returned_0 = test_index.nearest_many(
+            [PitchClassSet([0, 1, 2]), PitchClassSet([0, 4, 8])], k=2, norm="L2"
+        )
+        self.assertEqual(returned_0[0][0], (0.0, PitchClassSet([0, 1, 2])))
+        self.assertEqual(returned_0[1][0][1], PitchClassSet([0, 4, 8]))
+        self.assertEqual(len(returned_0[1]), 2)
+
+
+class MotifIndexTest(unittest.TestCase):
+    def test_find(self):
+        test_sequence_0 = PitchClassSequence([0, 4, 7, 2, 5, 9, 11, 7, 4, 0])
+        test_sequence_1 = PitchClassSequence([1, 5, 8, 1, 9, 6, 2])
+        test_index = MotifIndex([test_sequence_0, test_sequence_1])
+        self.assertEqual(test_index.find([0, 4, 7]), [(0, 0), (1, 0)])
+        returned_0 = test_index.find([0, 4, 7], "TI")
+        self.assertEqual(returned_0, [(0, 0), (0, 6), (1, 0), (1, 3)])
+        returned_1 = test_index.find([0, 4, 7], "TIR")
+        self.assertEqual(
+            returned_1, [(0, 0), (0, 3), (0, 6), (0, 7), (1, 0), (1, 3), (1, 4)]
+        )
+        self.assertEqual(test_index.find([0, 4, 7, 0]), [(1, 0)])
+        self.assertEqual(test_index.find([7, 0]), [(1, 2)])
+        self.assertEqual(test_index.find([0, 1], "TM"), [(0, 2), (1, 2)])
+        self.assertEqual(len(test_index.find([3])), 17)
+        self.assertEqual(test_index.find([0, 3, 6, 9]), [])
+        with self.assertRaises(ValueError):
+            test_index.find([0, 4], "IR")
+        with self.assertRaises(ValueError):
+            test_index.find([])
+
+    def test_add(self):
+        test_index = MotifIndex(univ=24)
+        test_index.add(PitchClassSequence([0, 4, 7, 11]))
+        self.assertEqual(test_index.find([0, 8, 14]), [(0, 0)])
+        test_index.add(PitchClassSequence([6, 14, 20], univ=24))
+        self.assertEqual(test_index.find([0, 4, 7], "TI"), [])
+        self.assertEqual(test_index.find([0, 8, 14]), [(0, 0), (1, 0)])
+
+
+class IntervalVectorTest(unittest.TestCase):
+    def test_eq_hash(self):
+        returned_0 = PitchClassSet([0, 4, 7]).vector()
+        returned_1 = PitchClassSet([0, 3, 7]).vector()
+        self.assertEqual(returned_0, returned_1)
+        self.assertEqual(hash(returned_0), hash(returned_1))
+        self.assertNotEqual(returned_0, PitchClassSet([0, 1, 2]).vector())
+        self.assertNotEqual(returned_0, IntervalVector(returned_0.intervals, univ=13))
+        self.assertEqual(len({returned_0, returned_1}), 1)
+
+    def test_immutable(self):
+        test_vector = IntervalVector([0, 0, 1, 1, 1, 0])
+        test_vector.intervals.append(1)
+        self.assertEqual(test_vector.intervals, [0, 0, 1, 1, 1, 0])
+        with self.assertRaises(AttributeError):
+            test_vector.intervals = [1, 0, 0, 0, 0, 0]
+
+
 class IntervalSequenceTest(unittest.TestCase):
     def test_melody(self):
         test_sequence_0 = IntervalSequence([1, 2])
@@ -412,6 +1124,33 @@ class IntervalSequenceTest(unittest.TestCase):
         self.assertEqual(returned_0.pcs, [0, 1, 3])
         returned_1 = test_sequence_0.melody(11)
         self.assertEqual(returned_1.pcs, [11, 0, 2])
+        test_sequence_0.invert()
+        self.assertEqual(test_sequence_0.melody(0).pcs, [0, 11, 9])
+
+    def test_melody_after_change(self):
+        test_sequence_0 = IntervalSequence([1, 2, 3])
+        self.assertEqual(test_sequence_0.melody(0).pcs, [0, 1, 3, 6])
+        test_sequence_0.intervals.append(4)
+        self.assertEqual(test_sequence_0.intervals, [1, 2, 3])
+        self.assertEqual(test_sequence_0.melody(0).pcs, [0, 1, 3, 6])
+        test_sequence_0.intervals = [2, 2, 3, 4]
+        self.assertEqual(test_sequence_0.melody(0).pcs, [0, 2, 4, 7, 11])
+        test_sequence_0.univ = 7
+        self.assertEqual(test_sequence_0.melody(0).pcs, [0, 2, 4, 0, 4])
+
+    def test_lazy_melody(self):
+        test_sequence_0 = IntervalSequence([1, 2, 5, 7], univ=12)
+        returned_0 = test_sequence_0.lazy_melody(10)
+        self.assertIsInstance(returned_0, LazyMelody)
+        self.assertEqual(len(returned_0), 5)
+        self.assertEqual(returned_0[2], 1)
+        self.assertEqual(returned_0[-1], 1)
+        self.assertEqual(list(returned_0), [10, 11, 1, 6, 1])
+        self.assertEqual(returned_0[1:3].pcs, [11, 1])
+        returned_1 = returned_0.rerooted(0)
+        self.assertEqual(returned_1.realize().pcs, [0, 1, 3, 8, 3])
+        self.assertEqual(returned_1.transposed(-1).realize().pcs, [11, 0, 2, 7, 2])
+        self.assertEqual(returned_0.realize().pcs, [10, 11, 1, 6, 1])
 
     def test_private_inverted(self):
         test_sequence_0 = IntervalSequence([1, 4])
@@ -460,6 +1199,10 @@ class IntervalSequenceTest(unittest.TestCase):
         returned_0 = test_sequence_0.as_univ(18)
         self.assertIsInstance(returned_0, IntervalSequence)
         self.assertEqual(returned_0.intervals, [3, 9])
+        returned_1 = IntervalSequence([1, -2], univ=3).as_univ(3 * (2**53 + 1))
+        self.assertEqual(returned_1.intervals, [2**53 + 1, -2 * (2**53 + 1)])
+        with self.assertRaises(ValueError):
+            IntervalSequence([1, 2]).as_univ(18)
 
     def test_set_univ(self):
         test_sequence_0 = IntervalSequence([3, 6])
@@ -490,8 +1233,147 @@ class SetSequenceTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             test_sequence_4 = SetSequence((0, "one"))
 
+    def test_stream(self):
+        test_sequence_0 = SetSequence([[0, 4, 7], [5, 9, 0], [7, 11, 2, 5]])
+        returned_0 = test_sequence_0.stream()
+        self.assertIsInstance(returned_0, SetStream)
+        self.assertEqual(list(returned_0), test_sequence_0.pc_sets)
+        returned_1 = returned_0.transposed(1).collect()
+        self.assertIsInstance(returned_1, SetSequence)
+        self.assertEqual(returned_1.pc_sets[0].pcs, [1, 5, 8])
+        self.assertEqual(test_sequence_0.pc_sets[0].pcs, [0, 4, 7])
+
+    def test_transformation_graph(self):
+        test_sequence = SetSequence([[0, 4, 7], [2, 5, 9], [0, 3, 7], [0, 1]])
+        returned_0 = test_sequence.transformation_graph()
+        self.assertEqual(
+            returned_0,
+            {
+                (0, 1): [Transformation(-1, 9)],
+                (0, 2): [Transformation(-1, 7)],
+                (1, 2): [Transformation(1, 10)],
+            },
+        )
+        returned_1 = test_sequence.transformation_graph(span=1)
+        self.assertEqual(list(returned_1), [(0, 1), (1, 2)])
+        returned_2 = test_sequence.transformation_graph(inclusion=True)
+        self.assertEqual(list(returned_2), [(0, 1), (0, 2), (1, 2)])
+
+
+class SetStreamTest(unittest.TestCase):
+    def chords(self, count):
+        for i in range(count):
+            yield [i % 12, (i + 4) % 12, (i + 7) % 12]
+
+    def test_lazy(self):
+        test_stream = SetStream(self.chords(10**9)).inverted(0).prime_forms()
+        returned_0 = next(iter(test_stream))
+        self.assertEqual(returned_0.pcs, [0, 3, 7])
+        with self.assertRaises(TypeError):
+            list(SetStream([0, "one"]))
+
+    def test_stages(self):
+        test_stream = SetStream(list(self.chords(5)))  # iterated more than once
+        self.assertEqual(list(test_stream.set_classes("Tn")), ["3-11B"] * 5)
+        self.assertEqual(list(test_stream.common_tones()), [0, 0, 0, 0])
+        returned_0 = list(test_stream.transposed(1).as_univ(24))
+        self.assertEqual(returned_0[0].pcs, [2, 10, 16])
+        returned_1 = SetStream([[0, 4, 7], [0, 3], [0, 3, 8], [0]]).common_tones()
+        self.assertEqual(list(returned_1), [1, 2, 1])
+        returned_3 = SetStream([[0, 4, 7], [0, 5, 9], [2, 7, 11]]).voice_leadings()
+        self.assertEqual(list(returned_3), [3, 6])
+        returned_2 = test_stream.map(len).windowed(3, sum)
+        self.assertEqual(list(returned_2), [9, 9, 9])
+
+    def test_chunks(self):
+        returned_0 = list(SetStream(self.chords(10)).chunks(4))
+        self.assertEqual([len(chunk) for chunk in returned_0], [4, 4, 2])
+        self.assertEqual(returned_0[1][0].pcs, [4, 8, 11])
+
+    def test_from_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sets.txt")
+            with open(path, "w") as file:
+                file.write("# progression\n0 4 7\n\n5, 9, 0\n1\n")
+            test_stream = SetStream.from_file(path, univ=12)
+            returned_0 = test_stream.collect()
+            returned_2 = list(test_stream.common_tones())
+        returned_1 = [pc_set.pcs for pc_set in returned_0.pc_sets]
+        self.assertEqual(returned_1, [[0, 4, 7], [0, 5, 9], [1]])
+        self.assertEqual(returned_2, [1, 0])
+
+
+class BatchTest(unittest.TestCase):
+    def test_apply(self):
+        test_sets = [PitchClassSet(range(i % 7)).transposed(i) for i in range(40)]
+        pipeline = [("inverted", 2), ("m_transformed", 5), "complement"]
+        expected_0 = [s.inverted(2).m_transformed(5).complement() for s in test_sets]
+        for processes in (1, 2):
+            returned_0 = batch.apply(
+                test_sets, pipeline, processes=processes, chunk_size=16
+            )
+            self.assertIsInstance(returned_0, PitchClassSetArray)
+            self.assertEqual(list(returned_0), expected_0)
+            returned_1 = batch.apply(
+                test_sets,
+                [("transposed", 1), ("as_univ", 24), "vector"],
+                processes=processes,
+                chunk_size=16,
+            )
+            expected_1 = [s.transposed(1).as_univ(24).vector() for s in test_sets]
+            self.assertEqual(returned_1, expected_1)
+            returned_2 = batch.apply(
+                test_sets, [("set_class", "Tn")], processes=processes, chunk_size=16
+            )
+            self.assertEqual(returned_2, [s.set_class("Tn") for s in test_sets])
+        self.assertEqual(len(batch.apply([], ["complement"])), 0)
+        with self.assertRaises(ValueError):
+            batch.apply(test_sets, ["vector", "complement"])
+        with self.assertRaises(ValueError):
+            batch.apply(test_sets, ["retrograde"])
+        with self.assertRaises(ValueError):
+            batch.apply(test_sets, [("as_univ", 5)], processes=2, chunk_size=16)
+        for pipeline in (["inverted"], [("transposed",)], [("complement", 1)]):
+            with self.assertRaises(ValueError):
+                batch.apply(test_sets, pipeline, processes=2, chunk_size=16)
+
 
 class FunctionsTest(unittest.TestCase):
+    def test_similarity_matrix(self):
+        test_sets = [PitchClassSet([0, 1, 2]), PitchClassSet([0, 4, 8])]
+        test_sets.append(PitchClassSet([0, 1, 3]))
+        returned_0 = similarity_matrix(test_sets, measure="SIM")
+        self.assertEqual(returned_0.shape, (3, 3))
+        self.assertEqual(returned_0.tolist(), [[0, 6, 2], [6, 0, 6], [2, 6, 0]])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "matrix.f32")
+            returned_1 = similarity_matrix(
+                test_sets,
+                test_sets[1:],
+                measure="ATMEMB",
+                path=path,
+                tile_size=1,
+                processes=2,
+            )
+            self.assertEqual(returned_1.tolist(), [[0, 0.625], [1, 0], [0, 1]])
+            returned_1.release()
+            self.assertEqual(os.path.getsize(path), 4 * 3 * 2)
+        with self.assertRaises(ValueError):
+            similarity_matrix([])
+
+    def test_transformations_between(self):
+        pairs = [
+            (PitchClassSet([0, 4, 7]), PitchClassSet([4, 8, 11])),
+            (PitchClassSet([0, 1]), PitchClassSet([0, 1, 2])),
+            (PitchClassSet([0, 4, 7]), PitchClassSet([7, 15, 21], univ=24)),
+        ]
+        returned_0 = transformations_between(pairs)
+        self.assertEqual(
+            returned_0, [[Transformation(1, 4)], [], [Transformation(1, 7, 24)]]
+        )
+        returned_1 = transformations_between(pairs, inclusion=True)
+        self.assertEqual([len(found) for found in returned_1], [1, 4, 1])
+
     def test_aggregate(self):
         returned_0 = aggregate(12)
         self.assertIsInstance(returned_0, PitchClassSet)
@@ -511,6 +1393,215 @@ class FunctionsTest(unittest.TestCase):
         self.assertEqual(returned_2.univ, 7)
         self.assertEqual(returned_2.pcs, [0, 2, 4])
 
+    def test_set_classes(self):
+        returned_0 = list(set_classes(12, 3))
+        self.assertIsInstance(returned_0[0], PitchClassSet)
+        self.assertEqual(len(returned_0), 12)
+        self.assertIn([0, 3, 7], [s.pcs for s in returned_0])
+        self.assertNotIn([0, 4, 7], [s.pcs for s in returned_0])
+        returned_1 = list(set_classes(12, 3, "Tn"))
+        self.assertEqual(len(returned_1), 19)
+        self.assertIn([0, 4, 7], [s.pcs for s in returned_1])
+        returned_2 = [s.pcs for s in set_classes(5)]
+        expected = [[], [0], [0, 1], [0, 2], [0, 1, 2], [0, 1, 3], [0, 1, 2, 3]]
+        self.assertEqual(returned_2, expected + [[0, 1, 2, 3, 4]])
+        for univ in [7, 10, 13]:
+            primes = {
+                PitchClassSet._from_mask(mask, univ).prime_form()._mask
+                for mask in range(1 << univ)
+            }
+            self.assertEqual({s._mask for s in set_classes(univ)}, primes)
+
+    def test_set_class_count(self):
+        self.assertEqual(set_class_count(12), 224)
+        self.assertEqual(set_class_count(12, equivalence="Tn"), 352)
+        self.assertEqual(set_class_count(12, 6), 50)
+        self.assertEqual(set_class_count(12, 13), 0)
+        for univ, cardinality in [(24, 5), (31, 4), (19, 0)]:
+            count = sum(1 for s in set_classes(univ, cardinality))
+            self.assertEqual(set_class_count(univ, cardinality), count)
+
+    def test_rows(self):
+        returned_0 = list(rows(8, all_interval=True, symmetry="T"))
+        self.assertIsInstance(returned_0[0], PitchClassSequence)
+        self.assertEqual(len(returned_0), 24)
+        self.assertEqual(returned_0[0].pcs, [0, 1, 3, 6, 2, 7, 5, 4])
+        returned_1 = rows(10, all_interval=True, symmetry="T")
+        self.assertEqual(sum(1 for row in returned_1), 288)
+        self.assertEqual(sum(1 for row in rows(8, all_interval=True)), 8)
+        returned_2 = rows(8, all_interval=True, symmetry="TIRM")
+        self.assertEqual(sum(1 for row in returned_2), 4)
+        returned_3 = [row.pcs for row in rows(8, all_interval=True, processes=2)]
+        self.assertEqual(returned_3, [row.pcs for row in rows(8, all_interval=True)])
+        with self.assertRaises(ValueError):
+            list(rows(8, symmetry="TQ"))
+        with self.assertRaises(TypeError):
+            list(rows(8, constraint=lambda pcs: True, processes=2))
+        returned_4 = [row.pcs for row in rows(8, constraint=bool, processes=2)]
+        returned_5 = [row.pcs for row in rows(8, constraint=lambda pcs: True)]
+        self.assertEqual(returned_4, returned_5)
+        self.assertEqual(len(returned_4), 1320)
+
+    def test_rows_constraints(self):
+        returned_0 = list(rows(8, hexachord=PitchClassSet([0, 1, 3, 4], univ=8)))
+        for row in returned_0:
+            first_half = PitchClassSet(row.pcs[:4], univ=8)
+            self.assertEqual(first_half.prime_form().pcs, [0, 1, 3, 4])
+        self.assertEqual(len(returned_0), 288)
+        trichord = PitchClassSet([0, 1, 5], univ=9)
+        returned_1 = [row.pcs for row in rows(9, derived_from=trichord)]
+        self.assertEqual(len(returned_1), 114)
+        self.assertEqual(returned_1[0], [0, 1, 5, 2, 6, 7, 3, 4, 8])
+        for row in returned_1:
+            for start in range(0, 9, 3):
+                segment = PitchClassSet(row[start : start + 3], univ=9)
+                self.assertEqual(segment.prime_form().pcs, [0, 1, 5])
+        returned_2 = list(rows(6, constraint=lambda prefix: prefix[-1] != 5))
+        self.assertTrue(all(row.pcs[-1] != 5 for row in returned_2))
+        with self.assertRaises(ValueError):
+            list(rows(8, hexachord=PitchClassSet([0, 1, 2])))
+
+
+class SerializationTest(unittest.TestCase):
+    def objects(self):
+        return [
+            PitchClassSet([0, 4, 7]),
+            FrozenPitchClassSet([1, 2], univ=19),
+            PitchClassSet([0, 99], univ=100),
+            PitchClassSequence([0, 11, 3]),
+            PitchClassSequence([5, 300], univ=1200),
+            PitchClassSequence([1, 2**70], univ=2**72),
+            FrozenPitchClassSequence([3, 1], univ=13),
+            IntervalSequence([1, 11, 5]),
+            SetSequence([[0, 4, 7], PitchClassSet([0, 5], univ=19), 3]),
+        ]
+
+    def test_dumps_loads(self):
+        for test_object in self.objects():
+            returned_0 = loads(dumps(test_object))
+            self.assertIs(type(returned_0), type(test_object))
+            self.assertEqual(repr(returned_0), repr(test_object))
+        self.assertEqual(len(dumps(PitchClassSet([0, 4, 7]))), 4)
+        self.assertEqual(len(dumps(PitchClassSequence([0, 1] * 50))), 103)
+        self.assertEqual(loads(dumps(IntervalSequence([-1], 12))).intervals, [11])
+        with self.assertRaises(TypeError):
+            dumps([0, 4, 7])
+        with self.assertRaises(ValueError):
+            loads(dumps(PitchClassSequence([0, 1]))[:-1])
+        with self.assertRaises(ValueError):
+            loads(dumps(PitchClassSet([0])) + b"\0")
+
+    def test_corpus(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.pcc")
+            self.assertEqual(write_corpus(path, self.objects()), 9)
+            with open(path, "rb") as file:
+                data = file.read()
+            with Corpus(path) as corpus:
+                self.assertEqual(len(corpus), 9)
+                returned_0 = [repr(record) for record in corpus]
+                self.assertEqual(returned_0, [repr(x) for x in self.objects()])
+                self.assertEqual(corpus[-1].univ, 12)
+                with self.assertRaises(IndexError):
+                    corpus[9]
+                record_type, univ, view = corpus.record_view(4)
+                self.assertEqual((record_type, univ), (PitchClassSequence, 1200))
+                self.assertEqual(list(view), [5, 300])
+                view.release()
+                record_type, univ, view = corpus.record_view(0)
+                self.assertEqual(bytes(view), bytes([0b10010001, 0]))
+                view.release()
+            for truncated in (bytes(32), data[:10], data[:-8]):
+                with open(path, "wb") as file:
+                    file.write(truncated)
+                with self.assertRaises(ValueError):
+                    Corpus(path)
+
+
+class TableCacheTest(unittest.TestCase):
+    def tearDown(self):
+        set_table_cache(None)
+
+    def test_table_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            set_table_cache(directory)
+            self.assertEqual(PitchClassSet([0, 4, 7]).prime_form().pcs, [0, 3, 7])
+            self.assertEqual(os.listdir(directory), ["prime-12-TnI.v1.table"])
+            set_table_cache(directory)
+            self.assertIsInstance(pitchclasses._prime_table(12, True), memoryview)
+            returned_0 = build_table_cache([17])
+            self.assertEqual(len(returned_0), 2)
+            test_set = PitchClassSet([0, 3, 4, 16], univ=17)
+            for equivalence in ("Tn", "TnI"):
+                expected_0 = pitchclasses._searched_prime_mask(
+                    test_set._mask, 17, equivalence == "TnI"
+                )
+                returned_1 = test_set.prime_form(equivalence)._mask
+                self.assertEqual(returned_1, expected_0)
+            with open(returned_0[1], "r+b") as file:
+                file.seek(100)
+                file.write(b"\xff")
+            set_table_cache(directory)
+            self.assertIsNone(pitchclasses._cached_prime_table(17, True))
+            self.assertEqual(test_set.prime_form().pcs, [0, 1, 4, 5])
+            with self.assertRaises(ValueError):
+                build_table_cache([25])
+            set_table_cache(None)
+        with self.assertRaises(ValueError):
+            build_table_cache([12])
+
+    def test_catalog_cache(self):
+        expected_0 = list(set_classes(29, 4))
+        expected_1 = [(pc_set, pc_set.vector()) for pc_set in set_classes(29, 4, "Tn")]
+        with tempfile.TemporaryDirectory() as directory:
+            set_table_cache(directory)
+            returned_0 = build_table_cache([29], cardinalities=[4])
+            self.assertEqual(len(returned_0), 2)
+            self.assertIsNotNone(pitchclasses._cached_catalog(29, 4, True))
+            self.assertEqual(list(set_classes(29, 4)), expected_0)
+            self.assertEqual(set_class_catalog(29, 4, "Tn"), expected_1)
+            with open(returned_0[0], "r+b") as file:
+                file.seek(50)
+                file.write(b"\xff")
+            set_table_cache(directory)
+            self.assertIsNone(pitchclasses._cached_catalog(29, 4, False))
+            self.assertEqual(set_class_catalog(29, 4, "Tn"), expected_1)
+
+
+class InstrumentationTest(unittest.TestCase):
+    def test_instrumented(self):
+        original_init = pitchclasses.PitchClasses.__init__
+        with instrumented() as returned_0:
+            self.assertIs(returned_0, instrumentation)
+            self.assertTrue(instrumentation.enabled)
+            test_set = PitchClassSet([0, 4, 7])
+            for i in range(3):
+                test_set == PitchClassSet([0, 5, 10], univ=19)
+            test_set.as_univ(24)
+            FrozenPitchClassSequence([0, 1]).as_univ(24, "r")
+        self.assertFalse(instrumentation.enabled)
+        self.assertIs(pitchclasses.PitchClasses.__init__, original_init)
+        returned_1 = instrumentation.snapshot()
+        counters = returned_1["counters"]
+        self.assertEqual(counters["construct PitchClassSet"]["calls"], 5)
+        self.assertEqual(counters["set_pcs PitchClassSet"]["calls"], 4)
+        self.assertEqual(counters["set_pcs FrozenPitchClassSequence"]["calls"], 1)
+        self.assertEqual(counters["normalize 12,19->228"]["calls"], 3)
+        self.assertEqual(counters["rescale mask 12->228"]["calls"], 1)
+        self.assertEqual(counters["as_univ e 12->24"]["calls"], 1)
+        self.assertEqual(counters["as_univ r 12->24"]["calls"], 1)
+        self.assertGreaterEqual(returned_1["elapsed"], 0)
+        PitchClassSet([0])
+        self.assertEqual(instrumentation.snapshot()["counters"], counters)
+        self.assertIn("normalize 12,19->228", instrumentation.report())
+
+    def test_instrumented_batch(self):
+        test_sets = [PitchClassSet([0, i]) for i in range(5)]
+        with instrumented():
+            batch.apply(test_sets, [("as_univ", 36)], processes=1)
+        counters = instrumentation.snapshot()["counters"]
+        self.assertEqual(counters["as_univ e 12->36"]["calls"], 5)
+
 
 if __name__ == "__main__":
     unittest.main(exit=False)